@@ -1,6 +1,7 @@
 import os
 from datetime import timedelta
 from dotenv import load_dotenv
+from sqlalchemy.pool import StaticPool
 
 # Load environment variables from .env file
 load_dotenv()
@@ -22,6 +23,26 @@ class Config:
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # An in-memory SQLite database only exists on the connection that opened it,
+    # so every checkout has to share that one connection to see the same schema
+    if SQLALCHEMY_DATABASE_URI in ('sqlite://', 'sqlite:///:memory:'):
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'poolclass': StaticPool,
+            'connect_args': {'check_same_thread': False}
+        }
+    else:
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+    # Rows per multi-row INSERT when a bulk insert goes through insertmanyvalues
+    SQLALCHEMY_ENGINE_OPTIONS['insertmanyvalues_page_size'] = 10000
+    # psycopg2 only: batch executemany UPDATE/DELETE through execute_batch as
+    # well (INSERTs already go through insertmanyvalues; this supersedes the
+    # pre-1.4 use_batch_mode flag)
+    if SQLALCHEMY_DATABASE_URI.startswith(('postgresql://', 'postgresql+psycopg2://')):
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            'executemany_mode': 'values_plus_batch',
+            'executemany_batch_page_size': 500
+        })
+
     # Twilio WhatsApp configuration
     TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID')
     TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN')
@@ -31,6 +52,15 @@ class Config:
     CLOVER_API_BASE_URL = os.environ.get('CLOVER_BASE_URL', 'https://sandbox.dev.clover.com')
     CLOVER_ACCESS_TOKEN = os.environ.get('CLOVER_API_TOKEN')
     CLOVER_MERCHANT_ID = os.environ.get('CLOVER_MERCHANT_ID')
+    # Comma-separated merchants refreshed by the scheduler;
+    # defaults to CLOVER_MERCHANT_ID
+    CLOVER_MERCHANT_IDS = [
+        merchant.strip()
+        for merchant in (
+            os.environ.get('CLOVER_MERCHANT_IDS') or CLOVER_MERCHANT_ID or ''
+        ).split(',')
+        if merchant.strip()
+    ]
     
     # LLM configuration
     LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'openai').lower()  # 'openai', 'together', 'deepseek', 'xai'
@@ -54,6 +84,8 @@ class Config:
     
     # Cache configuration
     CACHE_EXPIRY_HOURS = int(os.environ.get('CACHE_EXPIRY_HOURS', 24))  # Cache data for 24 hours by default
+    # Reuse Clover inventory for 1 hour
+    INVENTORY_CACHE_SECONDS = int(os.environ.get('INVENTORY_CACHE_SECONDS', 3600))
     
     # CORS configuration
     CORS_ORIGINS = ['*']  # Allow all origins for development
@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from src.main import app, db
 from src.models.user import User
 from src.models.sales_cache import SalesCache, WhatsAppMessage
+from src.services.sales_processor import refresh_top_sellers
 
 def init_database():
     """Initialize the database with all tables."""
@@ -27,6 +28,7 @@ def init_database():
         print("Created tables:")
         print("- users")
         print("- sales_cache")
+        print("- top_sellers")
         print("- whatsapp_messages")
 
 def add_sample_data():
@@ -35,51 +37,26 @@ def add_sample_data():
         from datetime import datetime, timedelta
         
         # Add sample sales cache data
+        now = datetime.utcnow()
+        period = {
+            'merchant_id': "TEST_MERCHANT_001",
+            'period_start': now - timedelta(days=7),
+            'period_end': now,
+            'last_updated': now
+        }
         sample_sales = [
-            SalesCache(
-                merchant_id="TEST_MERCHANT_001",
-                item_id="ITEM_001",
-                item_name="Cappuccino",
-                category="Coffee",
-                quantity_sold=150,
-                total_revenue=750.0,
-                period_start=datetime.utcnow() - timedelta(days=7),
-                period_end=datetime.utcnow()
-            ),
-            SalesCache(
-                merchant_id="TEST_MERCHANT_001",
-                item_id="ITEM_002",
-                item_name="Latte",
-                category="Coffee",
-                quantity_sold=120,
-                total_revenue=660.0,
-                period_start=datetime.utcnow() - timedelta(days=7),
-                period_end=datetime.utcnow()
-            ),
-            SalesCache(
-                merchant_id="TEST_MERCHANT_001",
-                item_id="ITEM_003",
-                item_name="Espresso",
-                category="Coffee",
-                quantity_sold=80,
-                total_revenue=320.0,
-                period_start=datetime.utcnow() - timedelta(days=7),
-                period_end=datetime.utcnow()
-            ),
-            SalesCache(
-                merchant_id="TEST_MERCHANT_001",
-                item_id="ITEM_004",
-                item_name="Croissant",
-                category="Pastry",
-                quantity_sold=45,
-                total_revenue=135.0,
-                period_start=datetime.utcnow() - timedelta(days=7),
-                period_end=datetime.utcnow()
-            )
+            {'item_id': "ITEM_001", 'item_name': "Cappuccino", 'category': "Coffee",
+             'quantity_sold': 150, 'total_revenue': 750.0, **period},
+            {'item_id': "ITEM_002", 'item_name': "Latte", 'category': "Coffee",
+             'quantity_sold': 120, 'total_revenue': 660.0, **period},
+            {'item_id': "ITEM_003", 'item_name': "Espresso", 'category': "Coffee",
+             'quantity_sold': 80, 'total_revenue': 320.0, **period},
+            {'item_id': "ITEM_004", 'item_name': "Croissant", 'category': "Pastry",
+             'quantity_sold': 45, 'total_revenue': 135.0, **period}
         ]
         
-        for sale in sample_sales:
-            db.session.add(sale)
+        db.session.bulk_insert_mappings(SalesCache, sample_sales)
+        refresh_top_sellers([period['merchant_id']])
         
         db.session.commit()
         print("Sample data added successfully!")
@@ -20,6 +20,7 @@ from flask import Flask, send_from_directory
 from flask_cors import CORS
 from src.models.user import db
 from src.models.sales_cache import SalesCache, WhatsAppMessage
+from src.models.sales_cache import ensure_sales_cache_indexes
 from src.routes.user import user_bp
 from src.routes.webhook import webhook_bp
 from src.routes.api import api_bp
@@ -41,6 +42,7 @@ app.register_blueprint(api_bp, url_prefix='/api')
 db.init_app(app)
 with app.app_context():
     db.create_all()
+    ensure_sales_cache_indexes(db.engine)
 
 # Initialize and start scheduler
 scheduler = SalesDataScheduler()
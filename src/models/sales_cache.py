@@ -1,6 +1,14 @@
+from contextlib import contextmanager
+from sqlalchemy import delete, func, inspect, select
 from src.models.user import db
 from datetime import datetime
 
+# Pending message logs are written once this many have been queued
+BULK_LOG_BATCH_SIZE = 1000
+
+# session.info key holding that session's queued message rows
+_PENDING_LOGS_KEY = 'pending_message_logs'
+
 class SalesCache(db.Model):
     __tablename__ = 'sales_cache'
     
@@ -19,25 +27,118 @@ class SalesCache(db.Model):
     __table_args__ = (
         db.Index('idx_merchant_period', 'merchant_id', 'period_start', 'period_end'),
         db.Index('idx_item_merchant', 'item_id', 'merchant_id'),
+        db.Index('idx_merchant_last_updated', 'merchant_id', 'last_updated'),
+        db.Index('uq_sales_cache_merchant_item', 'merchant_id', 'item_id', unique=True),
     )
 
     def __repr__(self):
         return f'<SalesCache {self.item_name}: {self.quantity_sold} sold>'
 
+    @staticmethod
+    def row_to_dict(row):
+        """Serialize a SalesCache instance or a query row with the same columns."""
+        return {
+            'id': row.id,
+            'merchant_id': row.merchant_id,
+            'item_id': row.item_id,
+            'item_name': row.item_name,
+            'category': row.category,
+            'quantity_sold': row.quantity_sold,
+            'total_revenue': row.total_revenue,
+            'period_start': row.period_start.isoformat() if row.period_start else None,
+            'period_end': row.period_end.isoformat() if row.period_end else None,
+            'last_updated': row.last_updated.isoformat() if row.last_updated else None
+        }
+
     def to_dict(self):
+        return self.row_to_dict(self)
+
+
+# Serves the latest-period best-sellers lookup in period/quantity order
+db.Index(
+    'idx_merchant_period_quantity',
+    SalesCache.merchant_id,
+    SalesCache.period_start.desc(),
+    SalesCache.quantity_sold.desc()
+)
+
+# sales_cache indexes declared after the table first shipped; create_all() never
+# adds indexes to an existing table, so ensure_sales_cache_indexes() does
+_LATE_INDEXES = (
+    'uq_sales_cache_merchant_item',
+    'idx_merchant_last_updated',
+    'idx_merchant_period_quantity',
+)
+
+
+def ensure_sales_cache_indexes(engine):
+    """
+    Create any of _LATE_INDEXES missing from an existing sales_cache table.
+
+    Duplicate (merchant_id, item_id) rows are collapsed to the newest one before
+    the unique index is built. Safe to run on every startup.
+    """
+    inspector = inspect(engine)
+    table_name = SalesCache.__tablename__
+    existing = {index['name'] for index in inspector.get_indexes(table_name)}
+    existing.update(
+        constraint['name']
+        for constraint in inspector.get_unique_constraints(table_name)
+    )
+
+    indexes = {index.name: index for index in SalesCache.__table__.indexes}
+    with engine.begin() as connection:
+        for name in _LATE_INDEXES:
+            if name in existing:
+                continue
+            index = indexes[name]
+            if index.unique:
+                newest = select(func.max(SalesCache.id)).group_by(*index.columns)
+                connection.execute(
+                    delete(SalesCache).where(SalesCache.id.not_in(newest))
+                )
+            index.create(connection)
+
+
+class TopSellersSummary(db.Model):
+    """Ranked best-sellers per merchant, rebuilt from sales_cache on each write."""
+    __tablename__ = 'top_sellers'
+
+    merchant_id = db.Column(db.String(100), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    sales_cache_id = db.Column(db.Integer, nullable=False)
+    item_id = db.Column(db.String(100), nullable=False)
+    item_name = db.Column(db.String(200), nullable=False)
+    category = db.Column(db.String(100), nullable=True)
+    quantity_sold = db.Column(db.Integer, default=0)
+    total_revenue = db.Column(db.Float, default=0.0)
+    period_start = db.Column(db.DateTime, nullable=False)
+    period_end = db.Column(db.DateTime, nullable=False)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<TopSellersSummary {self.merchant_id} #{self.rank}: {self.item_name}>'
+
+    @staticmethod
+    def row_to_dict(row):
+        """Serialize a TopSellersSummary instance or a row with the same columns."""
+        # Same shape as SalesCache.to_dict so callers can't tell which table answered
         return {
-            'id': self.id,
-            'merchant_id': self.merchant_id,
-            'item_id': self.item_id,
-            'item_name': self.item_name,
-            'category': self.category,
-            'quantity_sold': self.quantity_sold,
-            'total_revenue': self.total_revenue,
-            'period_start': self.period_start.isoformat() if self.period_start else None,
-            'period_end': self.period_end.isoformat() if self.period_end else None,
-            'last_updated': self.last_updated.isoformat() if self.last_updated else None
+            'id': row.sales_cache_id,
+            'merchant_id': row.merchant_id,
+            'item_id': row.item_id,
+            'item_name': row.item_name,
+            'category': row.category,
+            'quantity_sold': row.quantity_sold,
+            'total_revenue': row.total_revenue,
+            'period_start': row.period_start.isoformat() if row.period_start else None,
+            'period_end': row.period_end.isoformat() if row.period_end else None,
+            'last_updated': row.refreshed_at.isoformat() if row.refreshed_at else None
         }
 
+    def to_dict(self):
+        return self.row_to_dict(self)
+
 class WhatsAppMessage(db.Model):
     __tablename__ = 'whatsapp_messages'
     
@@ -54,6 +155,24 @@ class WhatsAppMessage(db.Model):
     def __repr__(self):
         return f'<WhatsAppMessage {self.message_sid}: {self.message_body[:50]}...>'
 
+    @classmethod
+    def bulk_log(cls, session, records):
+        """
+        Queue message rows (column dicts) and write them in multi-row batches.
+
+        Rows are queued on the session itself (session.info), so each session
+        only ever writes its own rows. They are inserted once BULK_LOG_BATCH_SIZE
+        are pending; wrap the producer in bulk_logging() to write the remainder
+        and commit.
+        """
+        pending = session.info.setdefault(_PENDING_LOGS_KEY, [])
+        pending.extend(records)
+        if len(pending) < BULK_LOG_BATCH_SIZE:
+            return
+        batch = pending[:]
+        pending.clear()
+        session.execute(cls.__table__.insert(), batch)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -67,3 +186,21 @@ class WhatsAppMessage(db.Model):
             'response_time_ms': self.response_time_ms
         }
 
+
+@contextmanager
+def bulk_logging(session):
+    """
+    Write the logs session queued via WhatsAppMessage.bulk_log on exit, then commit.
+
+    If the body raises, the queued rows are dropped and the session rolled back instead.
+    """
+    try:
+        yield
+    except BaseException:
+        session.info.pop(_PENDING_LOGS_KEY, None)
+        session.rollback()
+        raise
+    batch = session.info.pop(_PENDING_LOGS_KEY, [])
+    if batch:
+        session.execute(WhatsAppMessage.__table__.insert(), batch)
+    session.commit()
@@ -4,9 +4,11 @@ API routes for sales data queries and system management.
 
 import logging
 from flask import Blueprint, jsonify, request
-from src.services.sales_processor import SalesProcessor
+from src.services.sales_processor import SalesProcessor, invalidate_best_sellers
 from src.services.clover_api import CloverAPIClient
 from src.config import Config
+from src.models.user import db, PING
+from src.models.sales_cache import SalesCache, TopSellersSummary, WhatsAppMessage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -78,7 +80,8 @@ def refresh_sales_data():
         # Process and cache sales data
         result = sales_processor.process_and_cache_sales_data(
             merchant_id=merchant_id,
-            days_back=days_back
+            days_back=days_back,
+            include_data=True
         )
         
         return jsonify(result)
@@ -151,7 +154,11 @@ def clear_sales_cache():
         
         # Clear cache for the specified merchant
         deleted_count = SalesCache.query.filter_by(merchant_id=merchant_id).delete()
+        TopSellersSummary.query.filter_by(merchant_id=merchant_id).delete()
         db.session.commit()
+        invalidate_best_sellers((merchant_id,))
+        # Refetch inventory on the next refresh so renamed items aren't masked
+        sales_processor.invalidate_item_lookup()
         
         return jsonify({
             'success': True,
@@ -204,7 +211,7 @@ def health_check():
     """Health check endpoint."""
     try:
         # Test database connection
-        db.session.execute('SELECT 1')
+        db.session.execute(PING)
         
         # Test Clover API (mock)
         clover_client = CloverAPIClient()
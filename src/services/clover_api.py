@@ -4,12 +4,42 @@ Clover API client for fetching sales data and orders.
 
 import requests
 import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from src.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Order date ranges are fetched as concurrent windows of this many days
+ORDER_SHARD_DAYS = 1
+ORDER_FETCH_WORKERS = 7
+# Pages each in-flight window may fetch ahead of the consumer
+ORDER_PREFETCH_PAGES = 2
+
+# Marks the end of a window's pages on its prefetch queue
+_WINDOW_DONE = object()
+
+# One pooled session shared by every client so keep-alive connections survive
+# across the short-lived clients built per request and per scheduler run; back
+# off on rate limiting (429) and transient gateway errors, honouring Retry-After
+_POOL_SIZE = max(20, ORDER_FETCH_WORKERS)
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=_POOL_SIZE,
+    pool_maxsize=_POOL_SIZE,
+    max_retries=Retry(
+        total=3, backoff_factor=0.2, status_forcelist=(429, 502, 503, 504)
+    )
+)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+
 class CloverAPIClient:
     """Client for interacting with the Clover API."""
     
@@ -32,12 +62,15 @@ class CloverAPIClient:
         else:
             self.use_mock_data = False
         
-        self.session = requests.Session()
+        self._session = _SESSION
+        # Credentials are per client, so they go on each request rather than the
+        # shared session
+        self.headers = {}
         if self.access_token:
-            self.session.headers.update({
+            self.headers = {
                 'Authorization': f'Bearer {self.access_token}',
                 'Content-Type': 'application/json'
-            })
+            }
     
     def get_orders(self, start_date: datetime = None, end_date: datetime = None, limit: int = 1000) -> List[Dict]:
         """
@@ -67,7 +100,7 @@ class CloverAPIClient:
                 end_ms = int(end_date.timestamp() * 1000)
                 params['filter'] = f'createdTime>={start_ms} AND createdTime<={end_ms}'
             
-            response = self.session.get(url, params=params)
+            response = self._session.get(url, params=params, headers=self.headers)
             response.raise_for_status()
             
             data = response.json()
@@ -78,6 +111,172 @@ class CloverAPIClient:
             # Fall back to mock data on error
             return self._get_mock_orders(start_date, end_date)
     
+    def iter_orders(self, start_date: datetime = None, end_date: datetime = None,
+                    page_size: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Stream orders from Clover API one page at a time.
+
+        Ranges longer than ORDER_SHARD_DAYS are split into day windows that are
+        fetched concurrently; pages are yielded in window order as they arrive.
+        At most ORDER_FETCH_WORKERS windows are in flight, each at most
+        ORDER_PREFETCH_PAGES pages ahead of the consumer, so memory stays
+        bounded by a handful of pages rather than the whole range.
+
+        Args:
+            start_date: Start date for order filtering
+            end_date: End date for order filtering
+            page_size: Number of orders requested per page
+
+        Yields:
+            Lists of order dictionaries, one per page
+        """
+        if self.use_mock_data:
+            yield self._get_mock_orders(start_date, end_date)
+            return
+
+        yielded = False
+        try:
+            sharded = (start_date and end_date
+                       and end_date - start_date > timedelta(days=ORDER_SHARD_DAYS))
+            if sharded:
+                windows = self._order_windows(start_date, end_date)
+                for page in self._iter_sharded_orders(windows, page_size):
+                    yielded = True
+                    yield page
+            else:
+                # Add date filtering for orders
+                order_filter = None
+                if start_date and end_date:
+                    start_ms = int(start_date.timestamp() * 1000)
+                    end_ms = int(end_date.timestamp() * 1000)
+                    order_filter = f'createdTime>={start_ms} AND createdTime<={end_ms}'
+
+                for page in self._iter_order_window(order_filter, page_size):
+                    yielded = True
+                    yield page
+
+        except requests.RequestException as e:
+            logger.error(f"Error fetching orders from Clover API: {e}")
+            if not yielded:
+                # Nothing consumed yet, so fall back to mock data like get_orders
+                yield self._get_mock_orders(start_date, end_date)
+                return
+            # A partial window would be cached as if complete
+            raise
+
+    def _order_windows(self, start_date: datetime, end_date: datetime) -> List[str]:
+        """Split a date range into createdTime filters of ORDER_SHARD_DAYS each."""
+        start_ms = int(start_date.timestamp() * 1000)
+        end_ms = int(end_date.timestamp() * 1000)
+        shard_ms = ORDER_SHARD_DAYS * 24 * 60 * 60 * 1000
+
+        window_starts = list(range(start_ms, end_ms, shard_ms))
+        windows = [
+            f'createdTime>={window_start} AND createdTime<{window_start + shard_ms}'
+            for window_start in window_starts[:-1]
+        ]
+        # Last window keeps end_date inclusive, like the unsharded filter
+        windows.append(f'createdTime>={window_starts[-1]} AND createdTime<={end_ms}')
+        return windows
+
+    def _iter_sharded_orders(self, windows: List[str],
+                             page_size: int) -> Iterator[List[Dict]]:
+        """
+        Fetch windows concurrently and yield their pages in window order.
+
+        Each window's worker hands pages over through a queue of
+        ORDER_PREFETCH_PAGES, and the next window is only submitted once the
+        consumer finishes one, so at most ORDER_FETCH_WORKERS windows are in flight.
+        Closing the generator early stops the workers.
+
+        Args:
+            windows: createdTime filters, in the order their pages are yielded
+            page_size: Number of orders requested per page
+
+        Yields:
+            Lists of order dictionaries, one per page
+        """
+        stop = threading.Event()
+
+        def hand_over(pages: queue.Queue, item) -> bool:
+            # Wait for room unless the consumer has gone away
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def fetch(window: str, pages: queue.Queue) -> None:
+            try:
+                for page in self._iter_order_window(window, page_size):
+                    if not hand_over(pages, page):
+                        return
+                hand_over(pages, _WINDOW_DONE)
+            except Exception as e:
+                hand_over(pages, e)
+
+        remaining = iter(windows)
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=min(ORDER_FETCH_WORKERS, len(windows)),
+                                thread_name_prefix='clover-orders') as executor:
+            def submit_next() -> None:
+                window = next(remaining, None)
+                if window is not None:
+                    pages = queue.Queue(maxsize=ORDER_PREFETCH_PAGES)
+                    executor.submit(fetch, window, pages)
+                    in_flight.append(pages)
+
+            try:
+                for _ in range(ORDER_FETCH_WORKERS):
+                    submit_next()
+                while in_flight:
+                    pages = in_flight.popleft()
+                    while True:
+                        item = pages.get()
+                        if item is _WINDOW_DONE:
+                            break
+                        if isinstance(item, Exception):
+                            raise item
+                        yield item
+                    submit_next()
+            finally:
+                stop.set()
+
+    def _iter_order_window(self, order_filter: Optional[str],
+                           page_size: int) -> Iterator[List[Dict]]:
+        """
+        Page through the orders matching one createdTime filter.
+
+        Args:
+            order_filter: Clover filter expression, or None for all orders
+            page_size: Number of orders requested per page
+
+        Yields:
+            Lists of order dictionaries, one per page
+        """
+        url = f"{self.base_url}/merchants/{self.merchant_id}/orders"
+        params = {
+            'limit': page_size,
+            'expand': 'lineItems'
+        }
+        if order_filter:
+            params['filter'] = order_filter
+
+        offset = 0
+        while True:
+            params['offset'] = offset
+            response = self._session.get(url, params=params, headers=self.headers)
+            response.raise_for_status()
+
+            page = response.json().get('elements', [])
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
     def get_inventory_items(self) -> List[Dict]:
         """
         Fetch inventory items from Clover API.
@@ -91,7 +290,7 @@ class CloverAPIClient:
         try:
             url = f"{self.base_url}/merchants/{self.merchant_id}/items"
             
-            response = self.session.get(url)
+            response = self._session.get(url, headers=self.headers)
             response.raise_for_status()
             
             data = response.json()
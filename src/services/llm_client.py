@@ -3,14 +3,42 @@ LLM client for generating natural language responses using various LLM providers
 Supported providers: OpenAI, DeepSeek, Together AI, xAI
 """
 
+import hashlib
+import json
 import logging
+import threading
 import time
 import openai
 from typing import Dict, List, Optional, Union
 from src.config import Config
+from src.services.whatsapp_client import sales_totals
 
 logger = logging.getLogger(__name__)
 
+# Single-question completions are reused for identical prompts for this long
+LLM_CACHE_SECONDS = 3600
+LLM_CACHE_MAX_ENTRIES = 1024
+
+# System message for every completion, single-question or batched
+_SYSTEM_PROMPT = (
+    "You are a helpful AI assistant for a coffee shop owner. You provide clear, "
+    "concise, and friendly responses about sales data and business analytics. "
+    "Always be professional but approachable."
+)
+
+# Prompt hash -> (expires_at, response); insertion-ordered, so the first key is
+# the oldest
+_response_cache: Dict[str, tuple] = {}
+_response_cache_lock = threading.Lock()
+
+
+def _response_cache_key(provider: str, model: str, temperature: float,
+                        prompt: str) -> str:
+    """Hash everything that determines a completion into a fixed-size cache key."""
+    key = f"{provider}|{model}|{temperature}|{prompt}"
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16)
+    return f"llm:{digest.hexdigest()}"
+
 class LLMClient:
     """Client for interacting with LLM services."""
     
@@ -85,6 +113,93 @@ class LLMClient:
             logger.error(f"❌ Error generating {self.provider} response after {total_time:.2f}ms: {e}")
             return self._generate_fallback_response(question, sales_data)
     
+    def generate_responses(self, questions: List[str], context: str = "",
+                           sales_data: Dict = None) -> List[str]:
+        """
+        Generate responses to several questions sharing one context and sales data.
+
+        With an LLM configured, all questions go out in one chat completion that
+        answers with a JSON array; if that reply can't be used, or no LLM is
+        configured, each question is answered on its own.
+
+        Args:
+            questions: The user's questions
+            context: Additional context for the LLM
+            sales_data: Sales data to include in the responses
+
+        Returns:
+            Generated response texts, in question order
+        """
+        if len(questions) > 1 and self.use_llm and self.client:
+            start_time = time.time()
+            try:
+                responses = self._generate_llm_batch_response(
+                    questions, context, sales_data
+                )
+                if responses is not None:
+                    total_time = (time.time() - start_time) * 1000
+                    logger.info(f"🤖 LLM BATCH END (SUCCESS) - {len(questions)} "
+                                f"questions in {total_time:.2f}ms")
+                    return responses
+                logger.warning(f"{self.provider.capitalize()} batch reply unusable, "
+                               f"answering questions individually")
+            except Exception as e:
+                logger.error(f"❌ {self.provider.capitalize()} batch API error: {e}")
+
+        return [
+            self.generate_response(question, context, sales_data)
+            for question in questions
+        ]
+
+    def _generate_llm_batch_response(self, questions: List[str], context: str,
+                                     sales_data: Dict = None) -> Optional[List[str]]:
+        """Answer all questions in one API call; None if the reply is unusable."""
+        numbered = "\n".join(
+            f"{i}. {question}" for i, question in enumerate(questions, 1)
+        )
+        prompt = (
+            self._prepare_prompt(numbered, context, sales_data)
+            + "\n\nAnswer each numbered question separately. Reply with only a "
+            f"JSON array of {len(questions)} strings, one answer per question, "
+            "in order."
+        )
+
+        params = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": _SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "max_tokens": 200 * len(questions),
+            "temperature": 0.7
+        }
+        if self.provider == 'together':
+            params['stop'] = ['</s>', '###']
+
+        api_start = time.time()
+        response = self.client.chat.completions.create(**params)
+        api_time = (time.time() - api_start) * 1000
+        logger.info(f"⏱️  {self.provider.upper()} BATCH API CALL TIME: "
+                    f"{api_time:.2f}ms")
+
+        try:
+            answers = json.loads(response.choices[0].message.content.strip())
+        except ValueError:
+            return None
+
+        if not isinstance(answers, list) or len(answers) != len(questions):
+            return None
+        if not all(isinstance(answer, str) and len(answer.strip()) >= 10
+                   for answer in answers):
+            return None
+        return [answer.strip() for answer in answers]
+
     def _generate_llm_response(self, question: str, context: str, sales_data: Dict = None) -> str:
         """Generate response using the configured LLM provider."""
         if not self.use_llm or not self.client:
@@ -104,7 +219,7 @@ class LLMClient:
                 "messages": [
                     {
                         "role": "system",
-                        "content": "You are a helpful AI assistant for a coffee shop owner. You provide clear, concise, and friendly responses about sales data and business analytics. Always be professional but approachable."
+                        "content": _SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -126,6 +241,16 @@ class LLMClient:
             params_time = (time.time() - params_start) * 1000
             logger.info(f"⏱️  PARAMS SETUP TIME: {params_time:.2f}ms")
             
+            # Identical prompts get identical answers for a while; skip the API call
+            cache_key = _response_cache_key(
+                self.provider, self.model, params['temperature'], prompt
+            )
+            with _response_cache_lock:
+                cached = _response_cache.get(cache_key)
+            if cached and cached[0] > time.time():
+                logger.info(f"✅ {self.provider.upper()} response served from cache")
+                return cached[1]
+
             # Make API call to the configured provider
             api_start = time.time()
             logger.info(f"🌐 Making API call to {self.provider.upper()} with model: {self.model}")
@@ -147,6 +272,14 @@ class LLMClient:
             validation_time = (time.time() - validation_start) * 1000
             logger.info(f"⏱️  RESPONSE VALIDATION TIME: {validation_time:.2f}ms")
             
+            with _response_cache_lock:
+                _response_cache.pop(cache_key, None)
+                if len(_response_cache) >= LLM_CACHE_MAX_ENTRIES:
+                    del _response_cache[next(iter(_response_cache))]
+                _response_cache[cache_key] = (
+                    time.time() + LLM_CACHE_SECONDS, generated_text
+                )
+
             logger.info(f"✅ {self.provider.upper()} response generated successfully ({len(generated_text)} chars)")
             return generated_text
             
@@ -230,8 +363,8 @@ class LLMClient:
         # Handle sales/revenue questions
         elif any(word in question_lower for word in ["sales", "revenue", "income", "money"]):
             if sales_data and sales_data.get('best_selling_items'):
-                total_revenue = sum(item['total_revenue'] for item in sales_data['best_selling_items'])
-                total_items = sum(item['quantity_sold'] for item in sales_data['best_selling_items'])
+                items = sales_data['best_selling_items']
+                total_items, total_revenue = sales_totals(items)
                 return f"Your recent sales show {total_items} items sold with ${total_revenue:.2f} in total revenue from your top items."
             
             return "Your sales data shows consistent performance across your menu items."
@@ -330,19 +463,23 @@ Just ask me any question about your sales and I'll help you find the answer!"""
         if not sales_data:
             return "No sales data available for analysis."
         
-        # Basic analysis
-        total_items = sum(item['quantity_sold'] for item in sales_data)
-        total_revenue = sum(item['total_revenue'] for item in sales_data)
-        avg_price = total_revenue / total_items if total_items > 0 else 0
-        
-        # Category breakdown
+        # Basic analysis and category breakdown in a single pass
+        total_items = 0
+        total_revenue = 0.0
         categories = {}
         for item in sales_data:
+            quantity = item['quantity_sold']
+            revenue = item['total_revenue']
+            total_items += quantity
+            total_revenue += revenue
+
             category = item.get('category', 'Unknown')
             if category not in categories:
                 categories[category] = {'items': 0, 'revenue': 0}
-            categories[category]['items'] += item['quantity_sold']
-            categories[category]['revenue'] += item['total_revenue']
+            categories[category]['items'] += quantity
+            categories[category]['revenue'] += revenue
+
+        avg_price = total_revenue / total_items if total_items > 0 else 0
         
         top_category = max(categories.items(), key=lambda x: x[1]['items'])[0] if categories else "Unknown"
         
@@ -2,10 +2,14 @@
 Message processor for handling WhatsApp messages and generating responses.
 """
 
+import asyncio
 import logging
 import re
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+from flask import current_app, has_app_context
 from src.services.llm_client import LLMClient
 from src.services.sales_processor import SalesProcessor
 from src.services.whatsapp_client import WhatsAppClient
@@ -14,24 +18,69 @@ from src.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Questions folded into one LLM call by process_messages_batch; larger groups
+# are split into chunks of this size that are sent concurrently
+LLM_BATCH_SIZE = 8
+
+# Once a merchant's sales cache is confirmed fresh, skip re-checking it for this
+# long
+FRESHNESS_CHECK_SECONDS = 60
+
+_SALES_CONTEXT = "You are a helpful coffee shop assistant providing sales insights."
+_GENERAL_CONTEXT = (
+    "You are a helpful assistant for a coffee shop owner. "
+    "You can help with sales data and general business questions."
+)
+_NO_SALES_DATA = (
+    "I don't have any sales data available right now. Please check back later."
+)
+_SALES_ERROR = (
+    "Sorry, I couldn't retrieve your sales data right now. Please try again later."
+)
+
+# Intent keywords and patterns, matched against the casefolded message body
+_GREETINGS = ('hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening')
+_HELP_KEYWORDS = ('help', 'what can you do', 'commands', 'options')
+_MULTIMEDIA_KEYWORDS = (
+    'report', 'chart', 'graph', 'visual', 'show me', 'summary',
+    'weekly', 'monthly', 'performance', 'dashboard'
+)
+
+# Common patterns for sales-related questions, compiled once at import
+_SALES_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'best.selling|top.selling|most.popular|best.*items?|top.*items?',
+    r'sales|revenue|income|money|made|earn',
+    r'how.many|quantity|sold',
+    r'what.*drink|beverage|coffee',
+    r'this.week|today|yesterday|last.*days?'
+))
+
 class MessageProcessor:
     """Processes incoming WhatsApp messages and generates appropriate responses."""
     
     def __init__(self):
         """Initialize the message processor."""
-        self.sales_processor = SalesProcessor()
-        self.llm_client = LLMClient()
-        self.whatsapp_client = WhatsAppClient()
-        self.multimedia_formatter = MultimediaFormatter()
-        
-        # Common patterns for sales-related questions
-        self.sales_patterns = [
-            r'best.selling|top.selling|most.popular|best.*items?|top.*items?',
-            r'sales|revenue|income|money|made|earn',
-            r'how.many|quantity|sold',
-            r'what.*drink|beverage|coffee',
-            r'this.week|today|yesterday|last.*days?'
-        ]
+        # merchant_id -> time until which its sales cache counts as fresh
+        self._fresh_until: Dict[str, float] = {}
+
+    # Collaborators are built on first use, so a processor that only answers
+    # greetings never pays for an LLM or Clover client
+
+    @cached_property
+    def sales_processor(self) -> SalesProcessor:
+        return SalesProcessor()
+
+    @cached_property
+    def llm_client(self) -> LLMClient:
+        return LLMClient()
+
+    @cached_property
+    def whatsapp_client(self) -> WhatsAppClient:
+        return WhatsAppClient()
+
+    @cached_property
+    def multimedia_formatter(self) -> MultimediaFormatter:
+        return MultimediaFormatter()
     
     def process_message(self, message_body: str, from_number: str) -> str:
         """
@@ -50,7 +99,7 @@ class MessageProcessor:
         try:
             # Message preprocessing
             preprocessing_start = time.time()
-            message_body = message_body.strip().lower()
+            message_body = message_body.strip().casefold()
             preprocessing_time = (time.time() - preprocessing_start) * 1000
             logger.info(f"⏱️  MESSAGE PREPROCESSING TIME: {preprocessing_time:.2f}ms")
             
@@ -101,21 +150,175 @@ class MessageProcessor:
             logger.error(f"❌ Error processing message after {total_time:.2f}ms: {e}")
             return "Sorry, I encountered an error while processing your request. Please try again."
     
+    async def process_message_async(self, message_body: str, from_number: str) -> str:
+        """
+        Process a message on a worker thread without blocking the event loop.
+
+        The caller's Flask app context, if any, is pushed on the worker thread
+        so database lookups behave as they do in process_message.
+
+        Args:
+            message_body: The text content of the message
+            from_number: The sender's phone number
+
+        Returns:
+            Response text to send back
+        """
+        app = current_app._get_current_object() if has_app_context() else None
+
+        def run() -> str:
+            if app is None:
+                return self.process_message(message_body, from_number)
+            with app.app_context():
+                return self.process_message(message_body, from_number)
+
+        return await asyncio.get_running_loop().run_in_executor(None, run)
+
+    async def consume(self, queue: asyncio.Queue, responses: Dict) -> None:
+        """
+        Answer queued messages until cancelled.
+
+        Several consumers can share one queue; the producer awaits queue.join()
+        to know every message has been answered.
+
+        Args:
+            queue: Queue of (key, message_body, from_number) tuples
+            responses: Filled in with key -> response text
+        """
+        while True:
+            key, message_body, from_number = await queue.get()
+            try:
+                responses[key] = await self.process_message_async(
+                    message_body, from_number
+                )
+            finally:
+                queue.task_done()
+
+    def process_messages_batch(self, messages: List[Tuple[str, str]]) -> List[str]:
+        """
+        Process several incoming messages, sharing LLM round-trips between them.
+
+        Empty messages, greetings, help requests and multimedia reports are
+        answered per message exactly as process_message does. Sales and general
+        questions are grouped by intent, and each group is answered through
+        LLMClient.generate_responses, LLM_BATCH_SIZE questions per call.
+
+        Args:
+            messages: (message_body, from_number) pairs
+
+        Returns:
+            Response texts, in input order
+        """
+        start_time = time.time()
+        logger.info(f"🔄 MESSAGE BATCH START - {len(messages)} messages")
+
+        responses = [None] * len(messages)
+        sales_by_merchant = {}
+        general = []
+
+        for i, (message_body, from_number) in enumerate(messages):
+            message = message_body.strip().casefold()
+            if (not message or self._is_greeting(message)
+                    or self._is_help_request(message)):
+                responses[i] = self.process_message(message_body, from_number)
+            elif self._is_sales_question(message):
+                if self._should_create_multimedia(message):
+                    responses[i] = self.process_message(message_body, from_number)
+                else:
+                    merchant_id = self._get_merchant_id(from_number)
+                    questions = sales_by_merchant.setdefault(merchant_id, [])
+                    questions.append((i, message))
+            else:
+                general.append((i, message))
+
+        best_sellers = {}
+        if sales_by_merchant:
+            try:
+                for merchant_id in sales_by_merchant:
+                    self._ensure_sales_fresh(merchant_id)
+
+                # One lookup for every merchant in the batch
+                best_sellers = (
+                    self.sales_processor.get_best_selling_items_for_merchants(
+                        sales_by_merchant, limit=10
+                    )
+                )
+            except Exception as e:
+                logger.error(f"❌ Error loading sales data for message batch: {e}")
+                best_sellers = None
+
+        for merchant_id, questions in sales_by_merchant.items():
+            if best_sellers is None:
+                answers = [_SALES_ERROR] * len(questions)
+            else:
+                answers = self._answer_sales_questions(
+                    merchant_id, questions, best_sellers.get(merchant_id)
+                )
+
+            for (i, _), answer in zip(questions, answers):
+                responses[i] = answer
+
+        if general:
+            answers = self._answer_in_batches(
+                [message for _, message in general], _GENERAL_CONTEXT
+            )
+            for (i, _), answer in zip(general, answers):
+                responses[i] = answer
+
+        total_time = (time.time() - start_time) * 1000
+        logger.info(f"🏁 MESSAGE BATCH END - Total time: {total_time:.2f}ms")
+        return responses
+
+    def _answer_sales_questions(self, merchant_id: str,
+                                questions: List[Tuple[int, str]],
+                                sales_data: Optional[List[Dict]]) -> List[str]:
+        """Answer one merchant's batched sales questions from its best sellers."""
+        if not sales_data:
+            return [_NO_SALES_DATA] * len(questions)
+        try:
+            return self._answer_in_batches(
+                [message for _, message in questions], _SALES_CONTEXT,
+                {'best_selling_items': sales_data}
+            )
+        except Exception as e:
+            logger.error(f"❌ Error handling sales question batch for merchant "
+                         f"{merchant_id}: {e}")
+            return [_SALES_ERROR] * len(questions)
+
+    def _answer_in_batches(self, questions: List[str], context: str,
+                           sales_data: Dict = None) -> List[str]:
+        """Answer questions LLM_BATCH_SIZE at a time, sending chunks concurrently."""
+        chunks = [
+            questions[i:i + LLM_BATCH_SIZE]
+            for i in range(0, len(questions), LLM_BATCH_SIZE)
+        ]
+        if len(chunks) == 1:
+            return self.llm_client.generate_responses(chunks[0], context, sales_data)
+
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            answered = executor.map(
+                lambda chunk: self.llm_client.generate_responses(
+                    chunk, context, sales_data
+                ),
+                chunks
+            )
+            return [answer for chunk_answers in answered for answer in chunk_answers]
+
     def _is_greeting(self, message: str) -> bool:
         """Check if the message is a greeting."""
-        greetings = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening']
         # Only match if the message is primarily a greeting (not mixed with other content)
         message_words = message.split()
-        return len(message_words) <= 3 and any(greeting in message for greeting in greetings)
+        return len(message_words) <= 3 and any(
+            greeting in message for greeting in _GREETINGS
+        )
     
     def _is_help_request(self, message: str) -> bool:
         """Check if the message is asking for help."""
-        help_keywords = ['help', 'what can you do', 'commands', 'options']
-        return any(keyword in message for keyword in help_keywords)
+        return any(keyword in message for keyword in _HELP_KEYWORDS)
     
     def _is_sales_question(self, message: str) -> bool:
         """Check if the message is asking about sales data."""
-        return any(re.search(pattern, message, re.IGNORECASE) for pattern in self.sales_patterns)
+        return any(pattern.search(message) for pattern in _SALES_PATTERNS)
     
     def _handle_sales_question(self, message: str, from_number: str) -> str:
         """
@@ -140,12 +343,7 @@ class MessageProcessor:
             
             # Check if cache is fresh, if not, refresh it
             cache_check_start = time.time()
-            if not self.sales_processor.is_cache_fresh(merchant_id):
-                logger.info(f"Cache is stale for merchant {merchant_id}, refreshing...")
-                refresh_start = time.time()
-                self.sales_processor.process_and_cache_sales_data(merchant_id)
-                refresh_time = (time.time() - refresh_start) * 1000
-                logger.info(f"⏱️  CACHE REFRESH TIME: {refresh_time:.2f}ms")
+            self._ensure_sales_fresh(merchant_id)
             cache_check_time = (time.time() - cache_check_start) * 1000
             logger.info(f"⏱️  CACHE CHECK TIME: {cache_check_time:.2f}ms")
             
@@ -156,7 +354,7 @@ class MessageProcessor:
             logger.info(f"⏱️  SALES DATA FETCH TIME: {sales_fetch_time:.2f}ms")
             
             if not sales_data:
-                return "I don't have any sales data available right now. Please check back later."
+                return _NO_SALES_DATA
             
             # Check if multimedia response is requested
             multimedia_start = time.time()
@@ -175,7 +373,7 @@ class MessageProcessor:
             llm_start = time.time()
             response = self.llm_client.generate_response(
                 message, 
-                context="You are a helpful coffee shop assistant providing sales insights.",
+                context=_SALES_CONTEXT,
                 sales_data={'best_selling_items': sales_data}
             )
             llm_time = (time.time() - llm_start) * 1000
@@ -188,7 +386,7 @@ class MessageProcessor:
         except Exception as e:
             total_time = (time.time() - start_time) * 1000
             logger.error(f"❌ Error handling sales question after {total_time:.2f}ms: {e}")
-            return "Sorry, I couldn't retrieve your sales data right now. Please try again later."
+            return _SALES_ERROR
     
     def _should_create_multimedia(self, message: str) -> bool:
         """
@@ -200,12 +398,8 @@ class MessageProcessor:
         Returns:
             True if multimedia response should be created
         """
-        multimedia_keywords = [
-            'report', 'chart', 'graph', 'visual', 'show me', 'summary',
-            'weekly', 'monthly', 'performance', 'dashboard'
-        ]
-        
-        return any(keyword in message.lower() for keyword in multimedia_keywords)
+        message = message.casefold()
+        return any(keyword in message for keyword in _MULTIMEDIA_KEYWORDS)
     
     def _handle_general_question(self, message: str, from_number: str) -> str:
         """
@@ -220,13 +414,34 @@ class MessageProcessor:
         """
         try:
             # For general questions, provide a helpful response
-            context = "You are a helpful assistant for a coffee shop owner. You can help with sales data and general business questions."
-            return self.llm_client.generate_response(message, context)
+            return self.llm_client.generate_response(message, _GENERAL_CONTEXT)
             
         except Exception as e:
             logger.error(f"Error handling general question: {e}")
             return "I'm not sure how to help with that. Try asking about your sales data, like 'What's my best-selling drink this week?'"
     
+    def _ensure_sales_fresh(self, merchant_id: str) -> None:
+        """
+        Refresh the merchant's sales cache if it is stale.
+
+        Once the cache is known to be fresh the merchant isn't checked again for
+        FRESHNESS_CHECK_SECONDS, so a burst of questions costs one check.
+        """
+        now = time.time()
+        if self._fresh_until.get(merchant_id, 0) > now:
+            return
+
+        if not self.sales_processor.is_cache_fresh(merchant_id):
+            logger.info(f"Cache is stale for merchant {merchant_id}, refreshing...")
+            refresh_start = time.time()
+            result = self.sales_processor.process_and_cache_sales_data(merchant_id)
+            refresh_time = (time.time() - refresh_start) * 1000
+            logger.info(f"⏱️  CACHE REFRESH TIME: {refresh_time:.2f}ms")
+            if not result.get('success'):
+                return
+
+        self._fresh_until[merchant_id] = now + FRESHNESS_CHECK_SECONDS
+
     def _get_merchant_id(self, from_number: str) -> str:
         """
         Extract merchant ID from phone number or use default.
@@ -2,18 +2,286 @@
 Sales data processor for analyzing Clover orders and updating cache.
 """
 
+import csv
+import io
+import json
 import logging
+import threading
 import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from typing import Iterable, List, Dict, Optional, Tuple
 from collections import defaultdict
-from src.models.sales_cache import SalesCache
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import any_, column, func, insert, literal, select, table
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models.sales_cache import SalesCache, TopSellersSummary
 from src.models.user import db
 from src.services.clover_api import CloverAPIClient
 from src.config import Config
 
 logger = logging.getLogger(__name__)
 
+_UNKNOWN_ITEM_META = (None, 'Uncategorized')
+
+# How long a MAX(last_updated) lookup is reused by is_cache_fresh
+FRESHNESS_MEMO_SECONDS = 5
+
+# Rows per INSERT ... ON CONFLICT statement; keeps SQLite under its
+# bound-parameter limit
+UPSERT_BATCH_SIZE = 500
+
+_BEST_SELLING_COLUMNS = (
+    SalesCache.id, SalesCache.merchant_id, SalesCache.item_id, SalesCache.item_name,
+    SalesCache.category, SalesCache.quantity_sold, SalesCache.total_revenue,
+    SalesCache.period_start, SalesCache.period_end, SalesCache.last_updated
+)
+
+# How long a best-sellers lookup is served from memory before re-querying
+BEST_SELLERS_CACHE_SECONDS = 300
+
+# (merchant_id, limit, category) -> (expires_at, items); shared by every SalesProcessor
+_best_sellers_cache = {}
+_best_sellers_lock = threading.Lock()
+
+# Ranks kept per merchant in the top_sellers summary
+TOP_SELLERS_DEPTH = 50
+
+_TOP_SELLERS_COLUMNS = (
+    TopSellersSummary.rank, TopSellersSummary.merchant_id,
+    TopSellersSummary.sales_cache_id, TopSellersSummary.item_id,
+    TopSellersSummary.item_name, TopSellersSummary.category,
+    TopSellersSummary.quantity_sold, TopSellersSummary.total_revenue,
+    TopSellersSummary.period_start, TopSellersSummary.period_end,
+    TopSellersSummary.refreshed_at
+)
+
+_UPSERT_COLUMNS = (
+    'item_name', 'category', 'quantity_sold', 'total_revenue',
+    'period_start', 'period_end', 'last_updated'
+)
+
+# Above this many rows, PostgreSQL writes stream through COPY into a staging table
+COPY_THRESHOLD = 100
+
+_COPY_COLUMNS = ('merchant_id', 'item_id') + _UPSERT_COLUMNS
+
+_SALES_STAGE = table('_sales_cache_stage', *(column(name) for name in _COPY_COLUMNS))
+
+# Overlaps each refresh's inventory fetch with its order stream. Shared by every
+# SalesProcessor, sized for the scheduler's parallel merchant refreshes; worker
+# threads are only started on first use.
+_INVENTORY_POOL = ThreadPoolExecutor(max_workers=8,
+                                     thread_name_prefix='clover-inventory')
+
+# Above this many values, merchant-scoped IN filters bind the whole list as one
+# parameter
+IN_LIST_THRESHOLD = 100
+
+
+def _in_values(column, values: List[str], dialect: str):
+    """
+    Build a ``column IN values`` filter, binding large lists as a single parameter.
+
+    PostgreSQL compares against ANY of one array parameter and SQLite unpacks
+    one JSON parameter with json_each, instead of binding a placeholder per
+    value. Short lists and other dialects use a plain IN.
+
+    Args:
+        column: Column to filter on
+        values: Values to match
+        dialect: Name of the session's SQL dialect
+
+    Returns:
+        SQL boolean expression
+    """
+    if len(values) > IN_LIST_THRESHOLD:
+        if dialect == 'postgresql':
+            return column == any_(literal(values, ARRAY(column.type)))
+        if dialect == 'sqlite':
+            json_values = func.json_each(json.dumps(values)).table_valued('value')
+            return column.in_(select(json_values.c.value))
+    return column.in_(values)
+
+
+def invalidate_best_sellers(merchant_ids: Iterable[str]) -> None:
+    """Drop memoized best-sellers lookups for the given merchants."""
+    merchant_ids = set(merchant_ids)
+    with _best_sellers_lock:
+        for key in [key for key in _best_sellers_cache if key[0] in merchant_ids]:
+            del _best_sellers_cache[key]
+
+
+def _write_sales_rows(merchant_ids: Iterable[str], rows: List[Dict]) -> None:
+    """
+    Write cache rows for the given merchants in the current transaction (no commit).
+
+    Args:
+        merchant_ids: Merchants whose cache the rows replace
+        rows: Row dictionaries keyed by SalesCache column name
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql' and len(rows) > COPY_THRESHOLD:
+        _copy_upsert_sales_rows(rows)
+    elif dialect in ('postgresql', 'sqlite'):
+        # Rows are keyed on (merchant_id, item_id), so overwrite in place
+        # instead of wiping the merchant's cache first
+        insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+        for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+            stmt = insert(SalesCache).values(rows[i:i + UPSERT_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['merchant_id', 'item_id'],
+                set_={column: stmt.excluded[column] for column in _UPSERT_COLUMNS}
+            )
+            db.session.execute(stmt)
+    else:
+        SalesCache.query.filter(
+            SalesCache.merchant_id.in_(list(merchant_ids))
+        ).delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(SalesCache, rows)
+
+    refresh_top_sellers(merchant_ids)
+
+
+def _copy_upsert_sales_rows(rows: List[Dict]) -> None:
+    """
+    Upsert cache rows on PostgreSQL via COPY into a staging table (no commit).
+
+    One COPY stream replaces the batched multi-row INSERTs, then a single
+    INSERT ... SELECT ... ON CONFLICT merges the staged rows into sales_cache.
+
+    Args:
+        rows: Row dictionaries keyed by SalesCache column name
+    """
+    buffer = io.StringIO()
+    # csv writes None as "" here, so FORCE_NULL below turns it back into NULL for
+    # the one nullable column
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    writer.writerows([row[name] for name in _COPY_COLUMNS] for row in rows)
+    buffer.seek(0)
+
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.execute(
+            'CREATE TEMP TABLE IF NOT EXISTS _sales_cache_stage '
+            '(LIKE sales_cache INCLUDING DEFAULTS) ON COMMIT DELETE ROWS'
+        )
+        cursor.execute('TRUNCATE _sales_cache_stage')
+        cursor.copy_expert(
+            f"COPY _sales_cache_stage ({', '.join(_COPY_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv, FORCE_NULL (category))",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+    stmt = pg_insert(SalesCache).from_select(
+        list(_COPY_COLUMNS), select(*_SALES_STAGE.c)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['merchant_id', 'item_id'],
+        set_={name: stmt.excluded[name] for name in _UPSERT_COLUMNS}
+    )
+    db.session.execute(stmt)
+
+
+def refresh_top_sellers(merchant_ids: Iterable[str]) -> None:
+    """
+    Rebuild the top_sellers summary for the given merchants (no commit).
+
+    Ranks each merchant's latest-period cache rows by quantity sold in one
+    INSERT ... SELECT, so best-seller lookups read a short pre-sorted list.
+
+    Args:
+        merchant_ids: Merchants whose summary is rebuilt
+    """
+    merchant_ids = list(merchant_ids)
+    dialect = db.session.get_bind().dialect.name
+    TopSellersSummary.query.filter(
+        _in_values(TopSellersSummary.merchant_id, merchant_ids, dialect)
+    ).delete(synchronize_session=False)
+
+    latest = aliased(SalesCache)
+    latest_period_start = (
+        select(func.max(latest.period_start))
+        .where(latest.merchant_id == SalesCache.merchant_id)
+        .scalar_subquery()
+    )
+    ranked = select(
+        SalesCache.merchant_id,
+        func.row_number().over(
+            partition_by=SalesCache.merchant_id,
+            order_by=(SalesCache.quantity_sold.desc(), SalesCache.id)
+        ).label('rank'),
+        SalesCache.id, SalesCache.item_id, SalesCache.item_name, SalesCache.category,
+        SalesCache.quantity_sold, SalesCache.total_revenue,
+        SalesCache.period_start, SalesCache.period_end, SalesCache.last_updated
+    ).where(
+        _in_values(SalesCache.merchant_id, merchant_ids, dialect),
+        SalesCache.period_start == latest_period_start
+    ).subquery()
+
+    db.session.execute(
+        insert(TopSellersSummary).from_select(
+            [
+                'merchant_id', 'rank', 'sales_cache_id', 'item_id', 'item_name',
+                'category', 'quantity_sold', 'total_revenue', 'period_start',
+                'period_end', 'refreshed_at'
+            ],
+            select(ranked).where(ranked.c.rank <= TOP_SELLERS_DEPTH)
+        )
+    )
+
+
+class SalesWriteBuffer:
+    """
+    Collects cache rows from several merchant refreshes, written in one transaction.
+
+    Used by the scheduler's multi-merchant refresh so the nightly job issues one
+    batch of upserts instead of a commit per merchant.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._merchant_ids = set()
+        self._rows = []
+
+    def enqueue(self, merchant_id: str, rows: List[Dict]):
+        """Queue one merchant's cache rows for the next flush."""
+        with self._lock:
+            self._merchant_ids.add(merchant_id)
+            self._rows.extend(rows)
+
+    def flush(self) -> int:
+        """
+        Write all queued rows and commit. Must run inside an app context.
+
+        Returns:
+            Number of rows written
+        """
+        with self._lock:
+            merchant_ids, self._merchant_ids = self._merchant_ids, set()
+            rows, self._rows = self._rows, []
+
+        if not rows:
+            return 0
+
+        try:
+            _write_sales_rows(merchant_ids, rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error flushing sales cache buffer: {e}")
+            raise
+
+        invalidate_best_sellers(merchant_ids)
+
+        logger.info(f"Flushed cache buffer: {len(rows)} items for "
+                    f"{len(merchant_ids)} merchants")
+        return len(rows)
+
+
 class SalesProcessor:
     """Processes sales data from Clover API and updates the cache."""
     
@@ -25,14 +293,22 @@ class SalesProcessor:
             clover_client: Clover API client instance
         """
         self.clover_client = clover_client or CloverAPIClient()
+        self._item_meta = None
+        self._item_meta_expires_at = 0.0
+        self._latest_update_memo = {}
     
-    def process_and_cache_sales_data(self, merchant_id: str, days_back: int = 7) -> Dict:
+    def process_and_cache_sales_data(self, merchant_id: str, days_back: int = 7,
+                                     include_data: bool = False,
+                                     write_buffer: SalesWriteBuffer = None) -> Dict:
         """
         Process sales data from Clover API and update the cache.
         
         Args:
             merchant_id: Merchant ID to process data for
             days_back: Number of days back to fetch data
+            include_data: Include the per-item sales metrics in the result
+            write_buffer: Optional SalesWriteBuffer; rows are queued on it and
+                only reach the database when the caller flushes it
             
         Returns:
             Dictionary with processing results
@@ -50,43 +326,55 @@ class SalesProcessor:
             
             logger.info(f"Processing sales data for merchant {merchant_id} from {start_date} to {end_date}")
             
-            # Fetch orders from Clover API
-            orders_fetch_start = time.time()
-            orders = self.clover_client.get_orders(start_date=start_date, end_date=end_date)
-            orders_fetch_time = (time.time() - orders_fetch_start) * 1000
-            logger.info(f"⏱️  CLOVER ORDERS FETCH TIME: {orders_fetch_time:.2f}ms ({len(orders)} orders)")
+            # Fetch inventory items for item details in the background (memoized,
+            # inventory rarely changes); it is only needed once orders are summed
+            fetch_start = time.time()
+            item_meta_future = _INVENTORY_POOL.submit(self._get_item_meta)
             
-            # Fetch inventory items for item details
-            inventory_fetch_start = time.time()
-            inventory_items = self.clover_client.get_inventory_items()
-            item_lookup = {item['id']: item for item in inventory_items}
-            inventory_fetch_time = (time.time() - inventory_fetch_start) * 1000
-            logger.info(f"⏱️  CLOVER INVENTORY FETCH TIME: {inventory_fetch_time:.2f}ms ({len(inventory_items)} items)")
+            # Stream order pages from Clover API and aggregate as they arrive
+            order_pages = self.clover_client.iter_orders(start_date=start_date,
+                                                         end_date=end_date)
+            totals = self._aggregate_orders(
+                order for page in order_pages for order in page
+            )
+            orders_fetch_time = (time.time() - fetch_start) * 1000
+            logger.info(f"⏱️  CLOVER ORDERS FETCH + AGGREGATION TIME: "
+                        f"{orders_fetch_time:.2f}ms ({totals[3]} orders)")
+
+            item_meta = item_meta_future.result()
+            fetch_time = (time.time() - fetch_start) * 1000
+            logger.info(f"⏱️  CLOVER FETCH WALL TIME: {fetch_time:.2f}ms "
+                        f"({len(item_meta)} inventory items)")
             
-            # Process orders to calculate sales metrics
+            # Resolve names and categories into the final metrics
             metrics_calc_start = time.time()
-            sales_data = self._calculate_sales_metrics(orders, item_lookup)
+            sales_data, orders_processed = self._build_sales_metrics(totals, item_meta)
             metrics_calc_time = (time.time() - metrics_calc_start) * 1000
             logger.info(f"⏱️  SALES METRICS CALCULATION TIME: {metrics_calc_time:.2f}ms")
             
             # Update cache in database
             cache_update_start = time.time()
-            cache_results = self._update_sales_cache(merchant_id, sales_data, start_date, end_date)
+            cache_results = self._update_sales_cache(
+                merchant_id, sales_data, start_date, end_date, write_buffer
+            )
             cache_update_time = (time.time() - cache_update_start) * 1000
             logger.info(f"⏱️  CACHE UPDATE TIME: {cache_update_time:.2f}ms")
             
             total_time = (time.time() - start_time) * 1000
             logger.info(f"📊 SALES PROCESSOR END - Total time: {total_time:.2f}ms")
             
-            return {
+            result = {
                 'success': True,
-                'orders_processed': len(orders),
+                'orders_processed': orders_processed,
                 'items_updated': len(cache_results),
                 'period_start': start_date.isoformat(),
                 'period_end': end_date.isoformat(),
-                'sales_data': sales_data,
                 'processing_time_ms': int(total_time)
             }
+            # Callers that only need the summary shouldn't keep the metrics alive
+            if include_data:
+                result['sales_data'] = sales_data
+            return result
             
         except Exception as e:
             total_time = (time.time() - start_time) * 1000
@@ -97,54 +385,117 @@ class SalesProcessor:
                 'processing_time_ms': int(total_time)
             }
     
-    def _calculate_sales_metrics(self, orders: List[Dict], item_lookup: Dict) -> Dict:
+    def _get_item_meta(self) -> Dict[str, Tuple[Optional[str], str]]:
+        """
+        Get inventory names and categories, refetching from Clover once the TTL expires.
+
+        Returns:
+            Dictionary mapping item IDs to (item name, category) tuples
+        """
+        now = time.time()
+        if self._item_meta is None or now >= self._item_meta_expires_at:
+            inventory_items = self.clover_client.get_inventory_items()
+            item_meta = {}
+            for item in inventory_items:
+                categories = (item.get('categories') or {}).get('elements') or ()
+                category = (categories[0].get('name', 'Uncategorized')
+                            if categories else 'Uncategorized')
+                item_meta[item['id']] = (item.get('name'), category)
+            self._item_meta = item_meta
+            self._item_meta_expires_at = now + Config.INVENTORY_CACHE_SECONDS
+        return self._item_meta
+
+    def invalidate_item_lookup(self):
+        """Drop the memoized inventory metadata so the next refresh refetches it."""
+        self._item_meta = None
+
+    def _calculate_sales_metrics(self, orders: Iterable[Dict],
+                                 item_meta: Dict) -> Tuple[Dict, int]:
         """
         Calculate sales metrics from orders.
         
         Args:
-            orders: List of order dictionaries
-            item_lookup: Dictionary mapping item IDs to item details
+            orders: Iterable of order dictionaries (consumed once)
+            item_meta: Dictionary mapping item IDs to (item name, category) tuples
+
+        Returns:
+            Tuple of (sales metrics per item, number of orders processed)
+        """
+        return self._build_sales_metrics(self._aggregate_orders(orders), item_meta)
+
+    def _aggregate_orders(self, orders: Iterable[Dict]) -> Tuple[Dict, Dict, Dict, int]:
+        """
+        Sum quantity and revenue per item across orders.
+
+        Args:
+            orders: Iterable of order dictionaries (consumed once)
             
         Returns:
-            Dictionary with sales metrics per item
+            Tuple of (quantities, revenue in cents, line-item names, orders processed)
         """
-        sales_metrics = defaultdict(lambda: {
-            'quantity_sold': 0,
-            'total_revenue': 0.0,
-            'item_name': '',
-            'category': ''
-        })
+        quantities = defaultdict(int)
+        revenue_cents = defaultdict(int)
+        line_item_names = {}
+        orders_processed = 0
         
+        # Only sum in the hot loop; names and categories are resolved once per
+        # distinct item afterwards. `or` fallbacks instead of `.get(key, {})`
+        # avoid building a throwaway default dict for every line item
         for order in orders:
-            line_items = order.get('lineItems', {}).get('elements', [])
+            orders_processed += 1
+            line_items = (order.get('lineItems') or {}).get('elements') or ()
             
             for line_item in line_items:
-                item = line_item.get('item', {})
+                item = line_item.get('item') or {}
                 item_id = item.get('id')
                 
                 if not item_id:
                     continue
                 
                 quantity = line_item.get('unitQty', 1)
-                price = line_item.get('price', 0) / 100.0  # Convert from cents to dollars
-                
-                # Get item details from inventory
-                item_details = item_lookup.get(item_id, {})
-                item_name = item.get('name') or item_details.get('name', f'Unknown Item {item_id}')
+                quantities[item_id] += quantity
+                revenue_cents[item_id] += (line_item.get('price') or 0) * quantity
                 
-                # Get category
-                categories = item_details.get('categories', {}).get('elements', [])
-                category = categories[0].get('name', 'Uncategorized') if categories else 'Uncategorized'
-                
-                # Update metrics
-                sales_metrics[item_id]['quantity_sold'] += quantity
-                sales_metrics[item_id]['total_revenue'] += price * quantity
-                sales_metrics[item_id]['item_name'] = item_name
-                sales_metrics[item_id]['category'] = category
+                line_item_name = item.get('name')
+                if line_item_name:
+                    line_item_names[item_id] = line_item_name
+
+        return quantities, revenue_cents, line_item_names, orders_processed
+
+    def _build_sales_metrics(self, totals: Tuple[Dict, Dict, Dict, int],
+                             item_meta: Dict) -> Tuple[Dict, int]:
+        """
+        Combine per-item totals with inventory names and categories.
+
+        Args:
+            totals: Result of _aggregate_orders
+            item_meta: Dictionary mapping item IDs to (item name, category) tuples
+
+        Returns:
+            Tuple of (sales metrics per item, number of orders processed)
+        """
+        quantities, revenue_cents, line_item_names, orders_processed = totals
+
+        sales_metrics = {}
+        for item_id, quantity_sold in quantities.items():
+            # Inventory name and category were resolved once when the lookup was built
+            inventory_name, category = item_meta.get(item_id, _UNKNOWN_ITEM_META)
+            item_name = (line_item_names.get(item_id) or inventory_name
+                         or f'Unknown Item {item_id}')
+
+            sales_metrics[item_id] = {
+                'quantity_sold': quantity_sold,
+                # Convert from cents to dollars
+                'total_revenue': revenue_cents[item_id] * 0.01,
+                'item_name': item_name,
+                'category': category
+            }
         
-        return dict(sales_metrics)
+        return sales_metrics, orders_processed
     
-    def _update_sales_cache(self, merchant_id: str, sales_data: Dict, start_date: datetime, end_date: datetime) -> List[str]:
+    def _update_sales_cache(self, merchant_id: str, sales_data: Dict,
+                            start_date: datetime, end_date: datetime,
+                            write_buffer: SalesWriteBuffer = None) -> List[str]:
         """
         Update the sales cache in the database using upsert logic.
         
@@ -153,42 +504,50 @@ class SalesProcessor:
             sales_data: Sales metrics dictionary
             start_date: Period start date
             end_date: Period end date
+            write_buffer: Optional buffer to queue the rows on instead of writing now
             
         Returns:
             List of updated item IDs
         """
-        updated_items = []
-        
         try:
-            # Clear existing cache for this merchant (broader cleanup)
-            SalesCache.query.filter_by(merchant_id=merchant_id).delete()
-            
-            # Insert new cache entries
-            for item_id, metrics in sales_data.items():
-                cache_entry = SalesCache(
-                    merchant_id=merchant_id,
-                    item_id=item_id,
-                    item_name=metrics['item_name'],
-                    category=metrics['category'],
-                    quantity_sold=metrics['quantity_sold'],
-                    total_revenue=metrics['total_revenue'],
-                    period_start=start_date,
-                    period_end=end_date,
-                    last_updated=datetime.utcnow()
-                )
-                
-                db.session.add(cache_entry)
-                updated_items.append(item_id)
+            # One timestamp for the whole batch
+            now = datetime.utcnow()
             
+            rows = [
+                {
+                    'merchant_id': merchant_id,
+                    'item_id': item_id,
+                    'item_name': metrics['item_name'],
+                    'category': metrics['category'],
+                    'quantity_sold': metrics['quantity_sold'],
+                    'total_revenue': metrics['total_revenue'],
+                    'period_start': start_date,
+                    'period_end': end_date,
+                    'last_updated': now
+                }
+                for item_id, metrics in sales_data.items()
+            ]
+
+            if write_buffer is not None:
+                write_buffer.enqueue(merchant_id, rows)
+                return list(sales_data.keys())
+
+            _write_sales_rows((merchant_id,), rows)
             db.session.commit()
-            logger.info(f"Updated cache for {len(updated_items)} items")
+            self.invalidate_freshness(merchant_id)
+            invalidate_best_sellers((merchant_id,))
+            logger.info(f"Updated cache for {len(rows)} items")
             
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error updating sales cache: {e}")
             raise
         
-        return updated_items
+        return list(sales_data.keys())
+
+    def invalidate_freshness(self, merchant_id: str):
+        """Forget the memoized last-update time so the next check sees new rows."""
+        self._latest_update_memo.pop(merchant_id, None)
     
     def get_best_selling_items(self, merchant_id: str, limit: int = 10, category: str = None) -> List[Dict]:
         """
@@ -202,27 +561,121 @@ class SalesProcessor:
         Returns:
             List of best-selling items
         """
-        try:
-            query = SalesCache.query.filter_by(merchant_id=merchant_id)
+        key = (merchant_id, limit, category)
+        now = time.time()
+        with _best_sellers_lock:
+            cached = _best_sellers_cache.get(key)
+        if cached and cached[0] > now:
+            return [dict(item) for item in cached[1]]
+
+        items = self._query_best_selling_items(merchant_id, limit, category)
+        if items:
+            with _best_sellers_lock:
+                _best_sellers_cache[key] = (
+                    now + BEST_SELLERS_CACHE_SECONDS, [dict(item) for item in items]
+                )
+        return items
+
+    def get_best_selling_items_for_merchants(
+            self, merchant_ids: Iterable[str], limit: int = 10
+    ) -> Dict[str, List[Dict]]:
+        """
+        Get best-selling items for several merchants at once.
+
+        Lookups not already memoized are answered from the top_sellers summary
+        in a single query instead of one query per merchant. Merchants without
+        summary rows fall back to get_best_selling_items.
+
+        Args:
+            merchant_ids: Merchant IDs
+            limit: Maximum number of items per merchant
             
-            if category:
-                query = query.filter_by(category=category)
+        Returns:
+            Dictionary mapping each merchant ID to its best-selling items
+        """
+        results = {}
+        missing = []
+        now = time.time()
+        with _best_sellers_lock:
+            for merchant_id in dict.fromkeys(merchant_ids):
+                cached = _best_sellers_cache.get((merchant_id, limit, None))
+                if cached and cached[0] > now:
+                    results[merchant_id] = [dict(item) for item in cached[1]]
+                else:
+                    missing.append(merchant_id)
+
+        if not missing:
+            return results
+
+        if limit <= TOP_SELLERS_DEPTH:
+            try:
+                dialect = db.session.get_bind().dialect.name
+                top_rows = TopSellersSummary.query.with_entities(
+                    *_TOP_SELLERS_COLUMNS
+                ).filter(
+                    _in_values(TopSellersSummary.merchant_id, missing, dialect),
+                    TopSellersSummary.rank <= limit
+                ).order_by(TopSellersSummary.merchant_id, TopSellersSummary.rank).all()
+            except Exception as e:
+                logger.error(f"Error getting best-selling items for {len(missing)} "
+                             f"merchants: {e}")
+                top_rows = []
+
+            fetched = defaultdict(list)
+            for row in top_rows:
+                fetched[row.merchant_id].append(TopSellersSummary.row_to_dict(row))
             
-            # Get the most recent cache entries
-            latest_period = query.order_by(SalesCache.last_updated.desc()).first()
-            if not latest_period:
-                return []
+            expires_at = now + BEST_SELLERS_CACHE_SECONDS
+            with _best_sellers_lock:
+                for merchant_id, items in fetched.items():
+                    _best_sellers_cache[(merchant_id, limit, None)] = (
+                        expires_at, [dict(item) for item in items]
+                    )
+            results.update(fetched)
+
+        for merchant_id in missing:
+            if merchant_id not in results:
+                results[merchant_id] = self.get_best_selling_items(merchant_id,
+                                                                   limit=limit)
+
+        return results
+
+    def _query_best_selling_items(self, merchant_id: str, limit: int,
+                                  category: Optional[str]) -> List[Dict]:
+        """Read best-selling items from the database (see get_best_selling_items)."""
+        try:
+            if category is None and limit <= TOP_SELLERS_DEPTH:
+                # Pre-ranked summary answers the common unfiltered lookup
+                top_rows = TopSellersSummary.query.with_entities(
+                    *_TOP_SELLERS_COLUMNS
+                ).filter(
+                    TopSellersSummary.merchant_id == merchant_id
+                ).order_by(TopSellersSummary.rank).limit(limit).all()
+                if top_rows:
+                    return [TopSellersSummary.row_to_dict(row) for row in top_rows]
             
-            # Filter by the latest period
-            query = query.filter_by(
-                period_start=latest_period.period_start,
-                period_end=latest_period.period_end
+            # Latest refresh period for the merchant, resolved inside the same query
+            latest_period_start = (
+                select(func.max(SalesCache.period_start))
+                .where(SalesCache.merchant_id == merchant_id)
+                .scalar_subquery()
             )
             
-            # Order by quantity sold and limit results
-            best_selling = query.order_by(SalesCache.quantity_sold.desc()).limit(limit).all()
+            query = SalesCache.query.filter(
+                SalesCache.merchant_id == merchant_id,
+                SalesCache.period_start == latest_period_start
+            )
+
+            if category:
+                query = query.filter(SalesCache.category == category)
+
+            # Order by quantity sold and limit results; plain column tuples skip ORM
+            # hydration
+            rows = query.with_entities(*_BEST_SELLING_COLUMNS).order_by(
+                SalesCache.quantity_sold.desc()
+            ).limit(limit).all()
             
-            return [item.to_dict() for item in best_selling]
+            return [SalesCache.row_to_dict(row) for row in rows]
             
         except Exception as e:
             logger.error(f"Error getting best-selling items: {e}")
@@ -243,17 +696,38 @@ class SalesProcessor:
             max_age_hours = Config.CACHE_EXPIRY_HOURS
         
         try:
-            latest_cache = SalesCache.query.filter_by(merchant_id=merchant_id).order_by(
-                SalesCache.last_updated.desc()
-            ).first()
+            latest_ts = self._get_latest_cache_update(merchant_id)
             
-            if not latest_cache:
+            if latest_ts is None:
                 return False
             
-            age = datetime.utcnow() - latest_cache.last_updated
+            age = datetime.utcnow() - latest_ts
             return age.total_seconds() < (max_age_hours * 3600)
             
         except Exception as e:
             logger.error(f"Error checking cache freshness: {e}")
             return False
 
+    def _get_latest_cache_update(self, merchant_id: str) -> Optional[datetime]:
+        """
+        Get the newest last_updated timestamp for a merchant's cache rows.
+
+        The value is memoized for a few seconds so bursts of freshness checks
+        share one MAX() query.
+
+        Args:
+            merchant_id: Merchant ID
+
+        Returns:
+            Latest update timestamp, or None if the merchant has no cache rows
+        """
+        now = time.time()
+        cached = self._latest_update_memo.get(merchant_id)
+        if cached and now - cached[0] < FRESHNESS_MEMO_SECONDS:
+            return cached[1]
+
+        latest_ts = db.session.query(func.max(SalesCache.last_updated)).filter(
+            SalesCache.merchant_id == merchant_id
+        ).scalar()
+        self._latest_update_memo[merchant_id] = (now, latest_ts)
+        return latest_ts
@@ -1,23 +1,32 @@
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.triggers.cron import CronTrigger
-from src.services.sales_processor import SalesProcessor
+from src.services.sales_processor import SalesProcessor, SalesWriteBuffer
+from src.services.clover_api import CloverAPIClient
 from src.models.user import db
 from src.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Merchants are independent Clover tenants, so their refreshes can run side by side
+MAX_REFRESH_WORKERS = 8
+
 class SalesDataScheduler:
     """
     Background scheduler for automatic sales data refresh.
     """
     
     def __init__(self, app=None):
-        self.scheduler = BackgroundScheduler()
+        # Jobs are re-registered on boot, so an in-memory store is all that's needed
+        self.scheduler = BackgroundScheduler(jobstores={'default': MemoryJobStore()})
         self.app = app
         self.sales_processor = None
+        self._merchant_processors = {}
         
     def init_app(self, app):
         """Initialize scheduler with Flask app context."""
@@ -28,14 +37,18 @@ class SalesDataScheduler:
     def start(self):
         """Start the background scheduler."""
         if not self.scheduler.running:
-            # Schedule daily sales data refresh at 11:55 PM
-            self.scheduler.add_job(
-                func=self._refresh_sales_data,
-                trigger=CronTrigger(hour=23, minute=55),  # 11:55 PM
-                id='daily_sales_refresh',
-                name='Daily Sales Data Refresh',
-                replace_existing=True
-            )
+            # Schedule daily sales data refresh at 11:55 PM; a missed run (e.g. during
+            # a restart) fires once within the hour rather than being skipped or stacked
+            if self.scheduler.get_job('daily_sales_refresh') is None:
+                self.scheduler.add_job(
+                    func=self._refresh_sales_data,
+                    trigger=CronTrigger(hour=23, minute=55),  # 11:55 PM
+                    id='daily_sales_refresh',
+                    name='Daily Sales Data Refresh',
+                    coalesce=True,
+                    max_instances=1,
+                    misfire_grace_time=3600
+                )
             
             # Add a startup job to refresh data if cache is stale
             self.scheduler.add_job(
@@ -64,30 +77,131 @@ class SalesDataScheduler:
         logger.info("🔄 SCHEDULED REFRESH START - Daily sales data refresh at 11:55 PM")
         
         try:
-            with self.app.app_context():
-                # Get merchant ID from config
-                merchant_id = Config.CLOVER_MERCHANT_ID
-                
-                if not merchant_id:
-                    logger.warning("⚠️  No merchant ID configured - skipping scheduled refresh")
-                    return
-                
-                # Process and cache sales data
-                refresh_start = time.time()
-                success = self.sales_processor.process_and_cache_sales_data(merchant_id)
-                refresh_time = (time.time() - refresh_start) * 1000
-                
-                if success:
-                    total_time = (time.time() - start_time) * 1000
-                    logger.info(f"✅ SCHEDULED REFRESH SUCCESS - Merchant: {merchant_id}, "
-                              f"Refresh time: {refresh_time:.2f}ms, Total time: {total_time:.2f}ms")
-                else:
-                    logger.error(f"❌ SCHEDULED REFRESH FAILED - Merchant: {merchant_id}")
+            merchant_ids = Config.CLOVER_MERCHANT_IDS
+
+            if not merchant_ids:
+                logger.warning(
+                    "⚠️  No merchant ID configured - skipping scheduled refresh"
+                )
+                return
+
+            if len(merchant_ids) == 1:
+                results = [self._refresh_merchant(merchant_ids[0])]
+            else:
+                # Merchants are fetched and aggregated in parallel, but their cache
+                # rows are written together in one transaction at the end
+                write_buffer = SalesWriteBuffer()
+                workers = min(MAX_REFRESH_WORKERS, len(merchant_ids))
+                with ThreadPoolExecutor(max_workers=workers,
+                                        thread_name_prefix='sales-refresh') as executor:
+                    results = list(executor.map(
+                        partial(self._refresh_merchant, write_buffer=write_buffer),
+                        merchant_ids
+                    ))
+
+                results = self._flush_refreshes(merchant_ids, results, write_buffer)
+
+            total_time = (time.time() - start_time) * 1000
+            logger.info(f"🔄 SCHEDULED REFRESH END - "
+                        f"{sum(results)}/{len(results)} merchants refreshed, "
+                        f"Total time: {total_time:.2f}ms")
                     
         except Exception as e:
             total_time = (time.time() - start_time) * 1000
             logger.error(f"❌ SCHEDULED REFRESH ERROR - Time: {total_time:.2f}ms, Error: {e}")
     
+    def _flush_refreshes(self, merchant_ids, queued, write_buffer: SalesWriteBuffer):
+        """
+        Write the buffered merchant refreshes and report each merchant's outcome.
+
+        Args:
+            merchant_ids: Merchants that were refreshed, in order
+            queued: Per merchant, whether its rows were queued on write_buffer
+            write_buffer: Buffer holding the queued cache rows
+
+        Returns:
+            Per merchant, whether its refresh reached the database
+        """
+        queued_ids = [
+            merchant_id for merchant_id, ok in zip(merchant_ids, queued) if ok
+        ]
+
+        flush_start = time.time()
+        try:
+            with self.app.app_context():
+                rows_written = write_buffer.flush()
+        except Exception as e:
+            logger.error(f"❌ SCHEDULED REFRESH FAILED - Cache buffer flush failed, "
+                         f"dropped merchants: {', '.join(queued_ids)}, Error: {e}")
+            return [False] * len(merchant_ids)
+        flush_time = (time.time() - flush_start) * 1000
+        logger.info(f"⏱️  CACHE BUFFER FLUSH TIME: {flush_time:.2f}ms "
+                    f"({rows_written} items)")
+
+        for merchant_id in queued_ids:
+            self._get_merchant_processor(merchant_id).invalidate_freshness(merchant_id)
+            logger.info(f"✅ SCHEDULED REFRESH SUCCESS - Merchant: {merchant_id}")
+        return list(queued)
+
+    def _refresh_merchant(self, merchant_id: str,
+                          write_buffer: SalesWriteBuffer = None) -> bool:
+        """
+        Refresh one merchant's sales data in its own app context.
+
+        Args:
+            merchant_id: Merchant ID to refresh
+            write_buffer: Optional buffer the cache rows are queued on
+
+        Returns:
+            True if the refresh succeeded (or, with write_buffer, its rows were
+            queued), False otherwise
+        """
+        try:
+            # Each worker thread gets its own context and therefore its own
+            # scoped session
+            with self.app.app_context():
+                refresh_start = time.time()
+                processor = self._get_merchant_processor(merchant_id)
+                result = processor.process_and_cache_sales_data(
+                    merchant_id, write_buffer=write_buffer
+                )
+                refresh_time = (time.time() - refresh_start) * 1000
+
+                if result.get('success'):
+                    if write_buffer is not None:
+                        # Nothing is written yet; success is reported once the
+                        # buffer flushes
+                        logger.info(f"📥 SCHEDULED REFRESH QUEUED - "
+                                    f"Merchant: {merchant_id}, "
+                                    f"Refresh time: {refresh_time:.2f}ms")
+                    else:
+                        logger.info(f"✅ SCHEDULED REFRESH SUCCESS - "
+                                    f"Merchant: {merchant_id}, "
+                                    f"Refresh time: {refresh_time:.2f}ms")
+                    return True
+
+                logger.error(f"❌ SCHEDULED REFRESH FAILED - Merchant: {merchant_id}, "
+                             f"Error: {result.get('error')}")
+                return False
+
+        except Exception as e:
+            logger.error(f"❌ SCHEDULED REFRESH ERROR - Merchant: {merchant_id}, "
+                         f"Error: {e}")
+            return False
+
+    def _get_merchant_processor(self, merchant_id: str) -> SalesProcessor:
+        """Get the long-lived SalesProcessor for a merchant, creating it once."""
+        default_merchant = merchant_id == Config.CLOVER_MERCHANT_ID
+        if default_merchant and self.sales_processor is not None:
+            return self.sales_processor
+
+        processor = self._merchant_processors.get(merchant_id)
+        if processor is None:
+            # Clover URLs are merchant-scoped, so each merchant needs its own client
+            processor = SalesProcessor(CloverAPIClient(merchant_id=merchant_id))
+            processor = self._merchant_processors.setdefault(merchant_id, processor)
+        return processor
+
     def _startup_refresh_check(self):
         """
         Check if cache is stale on startup and refresh if needed.
@@ -110,10 +224,12 @@ class SalesDataScheduler:
                 if not is_fresh:
                     logger.info(f"🔄 Cache is stale - refreshing sales data for merchant: {merchant_id}")
                     refresh_start = time.time()
-                    success = self.sales_processor.process_and_cache_sales_data(merchant_id)
+                    result = self.sales_processor.process_and_cache_sales_data(
+                        merchant_id
+                    )
                     refresh_time = (time.time() - refresh_start) * 1000
                     
-                    if success:
+                    if result.get('success'):
                         total_time = (time.time() - start_time) * 1000
                         logger.info(f"✅ STARTUP REFRESH SUCCESS - Refresh time: {refresh_time:.2f}ms, "
                                   f"Total time: {total_time:.2f}ms")
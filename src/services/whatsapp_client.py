@@ -2,14 +2,102 @@
 Twilio WhatsApp client for sending messages and managing WhatsApp Business API.
 """
 
+import asyncio
 import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 from twilio.base.exceptions import TwilioException
-from typing import Optional, Dict, List
+from typing import Dict, List, Tuple
 from src.config import Config
 
 logger = logging.getLogger(__name__)
 
+# E.164: '+', non-zero country code digit, 10-15 digits in total
+_E164_RE = re.compile(r'\+[1-9][0-9]{9,14}')
+
+# Field getters for the per-message totals
+_QUANTITY = itemgetter('quantity_sold')
+_REVENUE = itemgetter('total_revenue')
+
+# Per-category emoji for item lines; anything else gets the pastry emoji
+_CAT_EMOJI = {'Coffee': '☕', 'Pastry': '🥐', 'Tea': '🍵'}
+_DEFAULT_EMOJI = '🥐'
+
+# Fixed message fragments, built once rather than per formatted message
+_NO_SALES_DATA = "No sales data available."
+_NO_REVENUE_DATA = "No revenue data available."
+_SALES_SUMMARY_HEADER = "📊 *Sales Summary*\n"
+_REVENUE_REPORT_HEADER = "💰 *Revenue Report*\n"
+_TOP_REVENUE_HEADER = "*Top Revenue Generators:*"
+
+# Shared across clients; sends are network-bound, so fan out wide. Worker threads
+# are only started on first use.
+_SEND_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix='whatsapp-send')
+
+# Twilio Messages REST endpoint and connection limits for the async send path
+_TWILIO_MESSAGES_URL = (
+    'https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Messages.json'
+)
+_ASYNC_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=50)
+_ASYNC_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+# Twilio clients keyed by (account_sid, auth_token), so every WhatsAppClient
+# reuses the same pooled keep-alive connections
+_TWILIO_CLIENTS: Dict[tuple, Client] = {}
+_TWILIO_CLIENTS_LOCK = threading.Lock()
+
+
+def _get_twilio_client(account_sid: str, auth_token: str) -> Client:
+    """Return the shared Twilio client for a set of credentials, creating it once."""
+    key = (account_sid, auth_token)
+    with _TWILIO_CLIENTS_LOCK:
+        client = _TWILIO_CLIENTS.get(key)
+        if client is None:
+            http_client = TwilioHttpClient(pool_connections=True)
+            http_client.session = requests.Session()
+            # Pool sized to match the bulk-send fan-out
+            adapter = HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=32,
+                max_retries=Retry(total=3, backoff_factor=0.3)
+            )
+            http_client.session.mount('https://', adapter)
+            client = Client(account_sid, auth_token, http_client=http_client)
+            _TWILIO_CLIENTS[key] = client
+        return client
+
+
+@lru_cache(maxsize=8192)
+def _validate_phone_number(phone_number: str) -> bool:
+    """
+    E.164 check behind WhatsAppClient.validate_phone_number.
+
+    Senders recur, so results are memoized.
+    """
+    if not phone_number:
+        return False
+
+    # Remove whatsapp: prefix if present
+    if phone_number.startswith('whatsapp:'):
+        phone_number = phone_number[9:]
+
+    return _E164_RE.fullmatch(phone_number) is not None
+
+
+def sales_totals(items: List[Dict]) -> Tuple[int, float]:
+    """Total units and revenue over every item; sum/map keep the loop in C."""
+    return sum(map(_QUANTITY, items)), sum(map(_REVENUE, items), 0.0)
+
+
 class WhatsAppClient:
     """Client for sending WhatsApp messages via Twilio."""
     
@@ -32,7 +120,7 @@ class WhatsAppClient:
             self.use_mock = True
         else:
             try:
-                self.client = Client(self.account_sid, self.auth_token)
+                self.client = _get_twilio_client(self.account_sid, self.auth_token)
                 self.use_mock = False
                 logger.info("Twilio WhatsApp client initialized successfully")
             except Exception as e:
@@ -103,6 +191,129 @@ class WhatsAppClient:
                 'body': message_body
             }
     
+    def send_messages_bulk(self, to_numbers: List[str], message_body: str,
+                           media_url: str = None) -> List[Dict]:
+        """
+        Send the same WhatsApp message to many recipients concurrently.
+
+        Args:
+            to_numbers: Recipients' WhatsApp numbers
+            message_body: Message text content
+            media_url: Optional URL for media attachment
+
+        Returns:
+            List of send results, in the same order as to_numbers
+        """
+        futures = [
+            _SEND_POOL.submit(self.send_message, to_number, message_body, media_url)
+            for to_number in to_numbers
+        ]
+        return [future.result() for future in futures]
+
+    async def send_message_async(self, to_number: str, message_body: str,
+                                 media_url: str = None,
+                                 http_client: httpx.AsyncClient = None) -> Dict:
+        """
+        Send a WhatsApp message without blocking the event loop.
+
+        Posts straight to Twilio's Messages endpoint; the result has the same
+        shape as send_message's.
+
+        Args:
+            to_number: Recipient's WhatsApp number (e.g., 'whatsapp:+1234567890')
+            message_body: Message text content
+            media_url: Optional URL for media attachment
+            http_client: Optional shared AsyncClient; a short-lived one is used
+                otherwise
+
+        Returns:
+            Dictionary with send result
+        """
+        if self.use_mock:
+            return self._send_mock_message(to_number, message_body, media_url)
+
+        if http_client is None:
+            async with httpx.AsyncClient(limits=_ASYNC_LIMITS,
+                                         timeout=_ASYNC_TIMEOUT) as http_client:
+                return await self.send_message_async(
+                    to_number, message_body, media_url, http_client
+                )
+
+        # Ensure the to_number has the whatsapp: prefix
+        if not to_number.startswith('whatsapp:'):
+            to_number = f'whatsapp:{to_number}'
+
+        message_params = {
+            'Body': message_body,
+            'From': self.whatsapp_number,
+            'To': to_number
+        }
+        if media_url:
+            message_params['MediaUrl'] = media_url
+
+        try:
+            response = await http_client.post(
+                _TWILIO_MESSAGES_URL.format(account_sid=self.account_sid),
+                data=message_params,
+                auth=(self.account_sid, self.auth_token)
+            )
+            if response.is_error:
+                # Gateways in front of Twilio can answer with HTML or an empty body
+                try:
+                    payload = response.json()
+                except ValueError:
+                    payload = {}
+                error = (payload.get('message') or response.text
+                         or f'HTTP {response.status_code}')
+                logger.error(f"Twilio error sending WhatsApp message: {error}")
+                return {
+                    'success': False,
+                    'error': error,
+                    'error_code': payload.get('code'),
+                    'to': to_number,
+                    'body': message_body
+                }
+
+            payload = response.json()
+            logger.info(f"WhatsApp message sent successfully. SID: {payload['sid']}")
+
+            return {
+                'success': True,
+                'message_sid': payload['sid'],
+                'status': payload.get('status'),
+                'to': to_number,
+                'from': self.whatsapp_number,
+                'body': message_body
+            }
+
+        except Exception as e:
+            logger.error(f"Unexpected error sending WhatsApp message: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'to': to_number,
+                'body': message_body
+            }
+
+    async def send_many(self, messages: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Send several WhatsApp messages concurrently over one pooled AsyncClient.
+
+        Args:
+            messages: (to_number, message_body) pairs
+
+        Returns:
+            List of send results, in the same order as messages
+        """
+        async with httpx.AsyncClient(limits=_ASYNC_LIMITS,
+                                     timeout=_ASYNC_TIMEOUT) as http_client:
+            return await asyncio.gather(*(
+                self.send_message_async(
+                    to_number, message_body, http_client=http_client
+                )
+                for to_number, message_body in messages
+            ))
+
     def _send_mock_message(self, to_number: str, message_body: str, media_url: str = None) -> Dict:
         """Send a mock message for testing purposes."""
         logger.info(f"MOCK: Sending WhatsApp message to {to_number}: {message_body}")
@@ -233,42 +444,46 @@ class WhatsAppClient:
         """Format sales summary data."""
         items = data.get('best_selling_items', [])
         if not items:
-            return "No sales data available."
+            return _NO_SALES_DATA
         
-        message_lines = ["📊 *Sales Summary*\\n"]
+        message_lines = [_SALES_SUMMARY_HEADER]
         
         for i, item in enumerate(items[:5], 1):
-            emoji = "☕" if item.get('category') == 'Coffee' else "🥐"
+            emoji = _CAT_EMOJI.get(item.get('category'), _DEFAULT_EMOJI)
             message_lines.append(
-                f"{emoji} {i}. *{item['item_name']}*\\n"
-                f"   Sold: {item['quantity_sold']} | Revenue: ${item['total_revenue']:.2f}\\n"
+                f"{emoji} {i}. *{item['item_name']}*\n"
+                f"   Sold: {item['quantity_sold']} | "
+                f"Revenue: ${item['total_revenue']:.2f}\n"
             )
         
-        total_items = sum(item['quantity_sold'] for item in items)
-        total_revenue = sum(item['total_revenue'] for item in items)
+        total_items, total_revenue = sales_totals(items)
         
-        message_lines.append(f"\\n📈 *Total*: {total_items} items | ${total_revenue:.2f}")
+        message_lines.append(f"📈 *Total*: {total_items} items | ${total_revenue:.2f}")
         
-        return "\\n".join(message_lines)
+        return "\n".join(message_lines)
     
     def _format_best_selling(self, data: Dict) -> str:
         """Format best-selling items data."""
         items = data.get('best_selling_items', [])
         if not items:
-            return "No sales data available."
+            return _NO_SALES_DATA
         
         top_item = items[0]
-        emoji = "☕" if top_item.get('category') == 'Coffee' else "🥐"
+        emoji = _CAT_EMOJI.get(top_item.get('category'), _DEFAULT_EMOJI)
         
-        message = f"{emoji} *Best Seller*: {top_item['item_name']}\\n"
-        message += f"Sold: {top_item['quantity_sold']} units\\n"
-        message += f"Revenue: ${top_item['total_revenue']:.2f}"
+        message = (
+            f"{emoji} *Best Seller*: {top_item['item_name']}\n"
+            f"Sold: {top_item['quantity_sold']} units\n"
+            f"Revenue: ${top_item['total_revenue']:.2f}"
+        )
         
         if len(items) > 1:
             second_item = items[1]
-            emoji2 = "☕" if second_item.get('category') == 'Coffee' else "🥐"
-            message += f"\\n\\n{emoji2} *Runner-up*: {second_item['item_name']}\\n"
-            message += f"Sold: {second_item['quantity_sold']} units"
+            emoji2 = _CAT_EMOJI.get(second_item.get('category'), _DEFAULT_EMOJI)
+            message = (
+                f"{message}\n\n{emoji2} *Runner-up*: {second_item['item_name']}\n"
+                f"Sold: {second_item['quantity_sold']} units"
+            )
         
         return message
     
@@ -276,24 +491,27 @@ class WhatsAppClient:
         """Format revenue report data."""
         items = data.get('best_selling_items', [])
         if not items:
-            return "No revenue data available."
+            return _NO_REVENUE_DATA
         
-        total_revenue = sum(item['total_revenue'] for item in items)
-        total_items = sum(item['quantity_sold'] for item in items)
+        total_items, total_revenue = sales_totals(items)
         avg_price = total_revenue / total_items if total_items > 0 else 0
         
-        message = f"💰 *Revenue Report*\\n\\n"
-        message += f"Total Revenue: ${total_revenue:.2f}\\n"
-        message += f"Items Sold: {total_items}\\n"
-        message += f"Average Price: ${avg_price:.2f}\\n\\n"
-        
-        # Top revenue generators
-        message += "*Top Revenue Generators:*\\n"
+        message_lines = [
+            _REVENUE_REPORT_HEADER,
+            f"Total Revenue: ${total_revenue:.2f}",
+            f"Items Sold: {total_items}",
+            f"Average Price: ${avg_price:.2f}",
+            "",
+            # Top revenue generators
+            _TOP_REVENUE_HEADER
+        ]
         for i, item in enumerate(items[:3], 1):
-            emoji = "☕" if item.get('category') == 'Coffee' else "🥐"
-            message += f"{emoji} {i}. {item['item_name']}: ${item['total_revenue']:.2f}\\n"
+            emoji = _CAT_EMOJI.get(item.get('category'), _DEFAULT_EMOJI)
+            message_lines.append(
+                f"{emoji} {i}. {item['item_name']}: ${item['total_revenue']:.2f}"
+            )
         
-        return message
+        return "\n".join(message_lines)
     
     def validate_phone_number(self, phone_number: str) -> bool:
         """
@@ -305,22 +523,4 @@ class WhatsAppClient:
         Returns:
             True if valid, False otherwise
         """
-        # Remove whatsapp: prefix if present
-        if phone_number.startswith('whatsapp:'):
-            phone_number = phone_number[9:]
-        
-        # Basic validation - should start with + and contain only digits
-        if not phone_number.startswith('+'):
-            return False
-        
-        # Remove + and check if remaining characters are digits
-        digits_only = phone_number[1:]
-        if not digits_only.isdigit():
-            return False
-        
-        # Check length (international numbers are typically 10-15 digits)
-        if len(digits_only) < 10 or len(digits_only) > 15:
-            return False
-        
-        return True
-
+        return _validate_phone_number(phone_number)
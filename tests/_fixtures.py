@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Shared, memoized test data for the integration tests.
+
+Clover orders and inventory are fetched once per process and reused by every
+test that only needs to read them.
+"""
+
+import functools
+
+from src.services.clover_api import CloverAPIClient
+
+
+@functools.lru_cache(maxsize=1)
+def orders_snapshot():
+    """Return the Clover orders fetched once for this test run."""
+    return CloverAPIClient().get_orders()
+
+
+@functools.lru_cache(maxsize=1)
+def inventory_snapshot():
+    """Return the Clover inventory items fetched once for this test run."""
+    return CloverAPIClient().get_inventory_items()
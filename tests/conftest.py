@@ -5,14 +5,21 @@ Pytest configuration file for Coffee Shop WhatsApp Bot tests.
 
 import pytest
 import os
-import sys
 from unittest.mock import Mock
+from sqlalchemy.orm import scoped_session, sessionmaker
 
-# Add the project root to the Python path
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-sys.path.insert(0, project_root)
+# Config reads DATABASE_URL at import time and the engine is built when src.main
+# imports, so point the whole test session at one in-memory database up front
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
 
 from src.main import app, db
+from src.services.message_processor import MessageProcessor
+from src.services.sales_processor import SalesProcessor
+from tests._fixtures import orders_snapshot, inventory_snapshot
+
+
+# Merchant whose mock sales the integration suites read
+SEED_MERCHANT_ID = 'TEST_MERCHANT_001'
 
 
 @pytest.fixture(scope='session')
@@ -20,7 +27,6 @@ def flask_app():
     """Create and configure a test Flask application."""
     app.config.update({
         'TESTING': True,
-        'DATABASE_URL': 'sqlite:///:memory:',
         'SECRET_KEY': 'test-secret-key',
         'WTF_CSRF_ENABLED': False
     })
@@ -44,34 +50,72 @@ def app_context(flask_app):
         yield flask_app
 
 
-@pytest.fixture
-def mock_clover_client():
-    """Mock Clover API client for testing."""
-    mock_client = Mock()
-    mock_client.get_orders.return_value = [
-        {
-            'id': 'ORDER_TEST_001',
-            'total': 500,
-            'lineItems': {
-                'elements': [
-                    {
-                        'item': {'id': 'ITEM_001', 'name': 'Cappuccino'},
-                        'unitQty': 2,
-                        'price': 500
-                    }
-                ]
-            }
-        }
-    ]
-    mock_client.get_inventory_items.return_value = [
-        {
-            'id': 'ITEM_001',
-            'name': 'Cappuccino',
-            'price': 500,
-            'categories': {'elements': [{'name': 'Coffee'}]}
-        }
-    ]
-    return mock_client
+@pytest.fixture(scope='session')
+def app_ctx(flask_app):
+    """
+    Application context with SEED_MERCHANT_ID's mock sales cached once per session.
+    
+    Integration tests that read sales data share this seed instead of each
+    rebuilding the cache; pair with db_savepoint for tests that write.
+    """
+    with flask_app.app_context():
+        SalesProcessor().process_and_cache_sales_data(SEED_MERCHANT_ID, days_back=7)
+        yield flask_app
+
+
+@pytest.fixture(scope='function')
+def db_savepoint(app_context):
+    """
+    Run a test inside a transaction that is rolled back at teardown.
+    
+    db.session is swapped for a session bound to one connection that joins the
+    outer transaction through SAVEPOINTs, so code under test can commit()
+    freely and nothing it writes outlives the test.
+    """
+    connection = db.engine.connect()
+    driver_connection = connection.connection.driver_connection
+    is_sqlite = connection.dialect.name == 'sqlite'
+    
+    if is_sqlite:
+        # pysqlite defers BEGIN until the first DML statement, so a leading
+        # SAVEPOINT would start (and its RELEASE commit) a transaction of its
+        # own; take over transaction control and begin explicitly instead
+        driver_isolation_level = driver_connection.isolation_level
+        driver_connection.isolation_level = None
+        connection.exec_driver_sql('BEGIN')
+    transaction = connection.begin() if not connection.in_transaction() else connection.get_transaction()
+    
+    original_session = db.session
+    db.session = scoped_session(sessionmaker(bind=connection, join_transaction_mode='create_savepoint'))
+    try:
+        yield db.session
+    finally:
+        db.session.remove()
+        db.session = original_session
+        transaction.rollback()
+        if is_sqlite:
+            driver_connection.isolation_level = driver_isolation_level
+        connection.close()
+
+
+@pytest.fixture(scope='session')
+def clover_orders():
+    """Clover orders fetched once and shared by every test in the session."""
+    orders_snapshot.cache_clear()
+    return orders_snapshot()
+
+
+@pytest.fixture(scope='session')
+def clover_inventory():
+    """Clover inventory items fetched once and shared by every test in the session."""
+    inventory_snapshot.cache_clear()
+    return inventory_snapshot()
+
+
+@pytest.fixture(scope='module')
+def message_processor():
+    """One MessageProcessor shared by every test in a module; its clients are built on first use."""
+    return MessageProcessor()
 
 
 @pytest.fixture
@@ -11,18 +11,17 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 sys.path.insert(0, project_root)
 
 from src.main import app, db
-from src.services.clover_api import CloverAPIClient
 from src.services.sales_processor import SalesProcessor
 from src.models.sales_cache import SalesCache
+from tests._fixtures import orders_snapshot, inventory_snapshot
+from sqlalchemy import case, func
 
 def test_clover_api():
     """Test Clover API client."""
     print("Testing Clover API client...")
     
-    client = CloverAPIClient()
-    
     # Test fetching orders
-    orders = client.get_orders()
+    orders = orders_snapshot()
     print(f"Fetched {len(orders)} orders")
     
     if orders:
@@ -32,7 +31,7 @@ def test_clover_api():
         print(f"- Line items: {len(orders[0]['lineItems']['elements'])}")
     
     # Test fetching inventory
-    inventory = client.get_inventory_items()
+    inventory = inventory_snapshot()
     print(f"\nFetched {len(inventory)} inventory items")
     
     if inventory:
@@ -72,18 +71,22 @@ def test_database_queries():
     print("\nTesting database queries...")
     
     with app.app_context():
-        # Get all sales cache entries
-        all_sales = SalesCache.query.all()
-        print(f"Total sales cache entries: {len(all_sales)}")
+        # Entry count, top quantity and Coffee count in one pass over the table
+        total_sales, top_quantity, coffee_sales = db.session.query(
+            func.count(SalesCache.id),
+            func.max(SalesCache.quantity_sold),
+            func.coalesce(func.sum(case((SalesCache.category == 'Coffee', 1), else_=0)), 0)
+        ).one()
+        print(f"Total sales cache entries: {total_sales}")
         
-        # Get best-selling item
-        best_item = SalesCache.query.order_by(SalesCache.quantity_sold.desc()).first()
-        if best_item:
-            print(f"Best-selling item: {best_item.item_name} ({best_item.quantity_sold} sold)")
+        # Look up the best-selling item's name only when there is one
+        if top_quantity is not None:
+            best_item_name = db.session.query(SalesCache.item_name).filter(
+                SalesCache.quantity_sold == top_quantity
+            ).limit(1).scalar()
+            print(f"Best-selling item: {best_item_name} ({top_quantity} sold)")
         
-        # Get sales by category
-        coffee_sales = SalesCache.query.filter_by(category='Coffee').all()
-        print(f"Coffee items in cache: {len(coffee_sales)}")
+        print(f"Coffee items in cache: {coffee_sales}")
 
 if __name__ == "__main__":
     test_clover_api()
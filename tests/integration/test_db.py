@@ -6,6 +6,8 @@ Test script for database operations
 import os
 import sys
 
+import pytest
+
 # Add the project root to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, project_root)
@@ -13,23 +15,28 @@ sys.path.insert(0, project_root)
 from src.main import app, db
 from src.models.sales_cache import SalesCache, WhatsAppMessage
 
+# Number of best sellers listed
+TOP_N = 10
+
+@pytest.mark.usefixtures('app_ctx')
 def test_database_operations():
     """Test basic database operations."""
     with app.app_context():
-        # Test reading sales data
-        sales = SalesCache.query.all()
-        print(f'Found {len(sales)} sales records:')
-        for sale in sales:
+        # Test reading sales data; the database counts and ranks, only the top rows come back
+        sales_count = SalesCache.query.count()
+        top_sales = SalesCache.query.order_by(SalesCache.quantity_sold.desc()).limit(TOP_N).all()
+        print(f'Found {sales_count} sales records (top {len(top_sales)}):')
+        for sale in top_sales:
             print(f'- {sale.item_name}: {sale.quantity_sold} sold, ${sale.total_revenue} revenue')
         
         # Test finding best-selling item
-        best_selling = SalesCache.query.order_by(SalesCache.quantity_sold.desc()).first()
+        best_selling = top_sales[0] if top_sales else None
         if best_selling:
             print(f'\nBest-selling item: {best_selling.item_name} ({best_selling.quantity_sold} sold)')
         
         # Test WhatsApp messages table
-        messages = WhatsAppMessage.query.all()
-        print(f'\nFound {len(messages)} WhatsApp messages')
+        message_count = WhatsAppMessage.query.count()
+        print(f'\nFound {message_count} WhatsApp messages')
 
 if __name__ == "__main__":
     test_database_operations()
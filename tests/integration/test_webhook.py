@@ -5,19 +5,47 @@ Test script for webhook endpoints and API routes.
 
 import requests
 import json
-import time
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Base URL for the Flask application
 BASE_URL = "http://localhost:5000"
 
+# (connect, read) timeouts so a hung server can't stall the run; refresh and
+# webhook calls go out to Clover/the LLM and get a longer read allowance
+TIMEOUT = (1, 5)
+SLOW_TIMEOUT = (1, 30)
+
+# One pooled keep-alive session shared by every request (and worker thread)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20,
+                                     max_retries=Retry(total=2, backoff_factor=0.1)))
+
+# Set TEST_VERBOSE=1 to pretty-print full response bodies
+VERBOSE = os.environ.get('TEST_VERBOSE') == '1'
+
+# MessageSid sequence; with the pid it stays unique across calls and reruns,
+# however quickly they follow each other
+_SID_SEQ = itertools.count()
+
+def _print_response(response):
+    """Print a response body: pretty JSON when verbose, otherwise a short preview."""
+    if VERBOSE:
+        print(f"Response: {json.dumps(response.json(), indent=2)}")
+    else:
+        print(f"Response ({len(response.content)}B): {response.text[:200]}")
+
 def test_health_check():
     """Test the health check endpoint."""
     print("Testing health check endpoint...")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/health")
+        response = SESSION.get(f"{BASE_URL}/api/health", timeout=TIMEOUT)
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        _print_response(response)
         return response.status_code == 200
     except Exception as e:
         print(f"Error: {e}")
@@ -28,9 +56,9 @@ def test_best_selling_api():
     print("\\nTesting best-selling items API...")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/sales/best-selling?limit=5")
+        response = SESSION.get(f"{BASE_URL}/api/sales/best-selling?limit=5", timeout=TIMEOUT)
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        _print_response(response)
         return response.status_code == 200
     except Exception as e:
         print(f"Error: {e}")
@@ -41,9 +69,9 @@ def test_cache_status():
     print("\\nTesting cache status API...")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/sales/cache-status")
+        response = SESSION.get(f"{BASE_URL}/api/sales/cache-status", timeout=TIMEOUT)
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        _print_response(response)
         return response.status_code == 200
     except Exception as e:
         print(f"Error: {e}")
@@ -59,14 +87,15 @@ def test_refresh_sales_data():
             "days_back": 7
         }
         
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/api/sales/refresh",
             json=data,
-            headers={'Content-Type': 'application/json'}
+            headers={'Content-Type': 'application/json'},
+            timeout=SLOW_TIMEOUT
         )
         
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        _print_response(response)
         return response.status_code == 200
     except Exception as e:
         print(f"Error: {e}")
@@ -86,22 +115,31 @@ def test_webhook_simulation():
             "How many cappuccinos did I sell?"
         ]
         
-        for message in test_messages:
-            print(f"\\nTesting message: '{message}'")
-            
-            data = {
-                "MessageSid": f"TEST_MSG_{int(time.time())}",
+        # Build every payload up front, each with its own MessageSid
+        payloads = [
+            {
+                "MessageSid": f"TEST_MSG_{next(_SID_SEQ)}_{os.getpid()}",
                 "From": "whatsapp:+1234567890",
                 "To": "whatsapp:+14155238886",
                 "Body": message
             }
-            
-            response = requests.post(
-                f"{BASE_URL}/api/test/webhook",
-                json=data,
-                headers={'Content-Type': 'application/json'}
-            )
-            
+            for message in test_messages
+        ]
+        
+        # Send all messages concurrently, then report in the original order
+        with ThreadPoolExecutor(max_workers=len(payloads)) as executor:
+            responses = list(executor.map(
+                lambda data: SESSION.post(
+                    f"{BASE_URL}/api/test/webhook",
+                    json=data,
+                    headers={'Content-Type': 'application/json'},
+                    timeout=SLOW_TIMEOUT
+                ),
+                payloads
+            ))
+        
+        for message, response in zip(test_messages, responses):
+            print(f"\\nTesting message: '{message}'")
             print(f"Status Code: {response.status_code}")
             if response.status_code == 200:
                 result = response.json()
@@ -120,9 +158,9 @@ def test_messages_api():
     print("\\nTesting messages API...")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/messages?limit=10")
+        response = SESSION.get(f"{BASE_URL}/api/messages?limit=10", timeout=TIMEOUT)
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        _print_response(response)
         return response.status_code == 200
     except Exception as e:
         print(f"Error: {e}")
@@ -133,17 +171,32 @@ def main():
     print("Starting webhook and API tests...")
     print("=" * 50)
     
-    tests = [
+    # Read-only endpoint probes don't depend on each other, so run them together
+    probes = [
         ("Health Check", test_health_check),
         ("Best Selling API", test_best_selling_api),
         ("Cache Status", test_cache_status),
-        ("Refresh Sales Data", test_refresh_sales_data),
-        ("Webhook Simulation", test_webhook_simulation),
         ("Messages API", test_messages_api)
     ]
+    tests = [
+        ("Refresh Sales Data", test_refresh_sales_data),
+        ("Webhook Simulation", test_webhook_simulation)
+    ]
     
     results = []
     
+    print(f"\\n{'='*20} Read-only API probes {'='*20}")
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        probe_results = list(executor.map(lambda probe: probe[1](), probes))
+    
+    for (test_name, _), success in zip(probes, probe_results):
+        results.append((test_name, success))
+        
+        if success:
+            print(f"✅ {test_name} passed")
+        else:
+            print(f"❌ {test_name} failed")
+    
     for test_name, test_func in tests:
         print(f"\\n{'='*20} {test_name} {'='*20}")
         success = test_func()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Async variant of the read-only API probes in test_webhook.py.
+
+Fires every probe over one aiohttp session with asyncio.gather, so the total
+wait is roughly that of the slowest endpoint.
+"""
+
+import asyncio
+import aiohttp
+import pytest
+
+# Base URL for the Flask application
+BASE_URL = "http://localhost:5000"
+
+# Overall per-request budget, matching test_webhook.py's read timeout
+TIMEOUT = aiohttp.ClientTimeout(total=5, connect=1)
+
+# (name, path) of each read-only endpoint probed
+PROBES = [
+    ("Health Check", "/api/health"),
+    ("Best Selling API", "/api/sales/best-selling?limit=5"),
+    ("Cache Status", "/api/sales/cache-status"),
+    ("Messages API", "/api/messages?limit=10")
+]
+
+async def _probe(session, path):
+    """GET one endpoint and return its status code."""
+    async with session.get(f"{BASE_URL}{path}") as response:
+        await response.read()
+        return response.status
+
+async def probe_read_endpoints():
+    """
+    Probe every read-only endpoint concurrently.
+    
+    Returns:
+        List of (name, status code or exception) in PROBES order
+    """
+    async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
+        statuses = await asyncio.gather(
+            *(_probe(session, path) for _, path in PROBES),
+            return_exceptions=True
+        )
+    return [(name, status) for (name, _), status in zip(PROBES, statuses)]
+
+def test_read_endpoints_async():
+    """Test the read-only API endpoints concurrently."""
+    print("Testing read-only API endpoints (async)...")
+    
+    results = asyncio.run(probe_read_endpoints())
+    for name, status in results:
+        print(f"{name}: {status}")
+    
+    if all(isinstance(status, aiohttp.ClientConnectorError) for _, status in results):
+        pytest.skip(f"No server listening at {BASE_URL}")
+    
+    assert all(status == 200 for _, status in results), results
+
+def main():
+    """Run the async probes."""
+    print("Starting async API probes...")
+    print("=" * 50)
+    
+    try:
+        test_read_endpoints_async()
+    except AssertionError:
+        print("❌ Some read-only probes failed")
+        return False
+    except pytest.skip.Exception as e:
+        print(f"⚠️  Skipped: {e}")
+        return False
+    
+    print("✅ All read-only probes passed")
+    return True
+
+if __name__ == "__main__":
+    main()
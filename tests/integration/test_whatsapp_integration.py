@@ -5,17 +5,36 @@ Test script for WhatsApp integration and end-to-end message flow.
 
 import os
 import sys
-import requests
+import asyncio
 import json
+import uuid
+import aiohttp
+import pytest
 
 # Add the project root to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, project_root)
 
-from src.main import app
+from src.main import app, db
+from src.models.sales_cache import WhatsAppMessage, bulk_logging
+from src.services.message_processor import MessageProcessor
 from src.services.whatsapp_client import WhatsAppClient
 from src.services.sales_processor import SalesProcessor
 
+# Built once for the whole module; its LLM and sales clients are created on first use
+message_processor = MessageProcessor()
+
+# Mock sales data, built once and shared by every call
+MOCK_SALES_DATA = {
+    'best_selling_items': [
+        {'item_name': 'Cappuccino', 'quantity_sold': 150, 'total_revenue': 750.0, 'category': 'Coffee'},
+        {'item_name': 'Latte', 'quantity_sold': 120, 'total_revenue': 660.0, 'category': 'Coffee'},
+        {'item_name': 'Espresso', 'quantity_sold': 80, 'total_revenue': 320.0, 'category': 'Coffee'},
+        {'item_name': 'Croissant', 'quantity_sold': 45, 'total_revenue': 135.0, 'category': 'Pastry'},
+        {'item_name': 'Muffin', 'quantity_sold': 30, 'total_revenue': 105.0, 'category': 'Pastry'}
+    ]
+}
+
 def test_whatsapp_client():
     """Test WhatsApp client functionality."""
     print("Testing WhatsApp Client...")
@@ -54,9 +73,12 @@ def test_whatsapp_client():
         }
     ]
     
-    for test_msg in test_messages:
+    results = asyncio.run(client.send_many(
+        [(test_msg['to'], test_msg['message']) for test_msg in test_messages]
+    ))
+    
+    for test_msg, result in zip(test_messages, results):
         print(f"\\nTesting: {test_msg['description']}")
-        result = client.send_message(test_msg['to'], test_msg['message'])
         
         if result['success']:
             print(f"✅ Message sent successfully")
@@ -74,35 +96,47 @@ def test_message_formatting():
     
     client = WhatsAppClient()
     
-    # Mock sales data
-    mock_sales_data = {
-        'best_selling_items': [
-            {'item_name': 'Cappuccino', 'quantity_sold': 150, 'total_revenue': 750.0, 'category': 'Coffee'},
-            {'item_name': 'Latte', 'quantity_sold': 120, 'total_revenue': 660.0, 'category': 'Coffee'},
-            {'item_name': 'Espresso', 'quantity_sold': 80, 'total_revenue': 320.0, 'category': 'Coffee'},
-            {'item_name': 'Croissant', 'quantity_sold': 45, 'total_revenue': 135.0, 'category': 'Pastry'},
-            {'item_name': 'Muffin', 'quantity_sold': 30, 'total_revenue': 105.0, 'category': 'Pastry'}
-        ]
-    }
-    
     # Test different message formats
     formats = ['sales_summary', 'best_selling', 'revenue_report']
     
     for format_type in formats:
         print(f"\\n{format_type.replace('_', ' ').title()} Format:")
         print("-" * 30)
-        formatted_msg = client.format_business_message(mock_sales_data, format_type)
+        formatted_msg = client.format_business_message(MOCK_SALES_DATA, format_type)
         print(formatted_msg)
 
+# Consumers draining the simulated webhook queue
+WEBHOOK_CONSUMERS = 4
+
+async def _process_webhooks(processor, webhooks):
+    """Queue every webhook, answer them with WEBHOOK_CONSUMERS consumers, return MessageSid -> response."""
+    queue = asyncio.Queue()
+    responses = {}
+    consumers = [asyncio.create_task(processor.consume(queue, responses)) for _ in range(WEBHOOK_CONSUMERS)]
+    
+    for webhook_data in webhooks:
+        queue.put_nowait((webhook_data['MessageSid'], webhook_data['Body'], webhook_data['From']))
+    await queue.join()
+    
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+    return responses
+
+# Consumers run process_message on executor threads, each in its own app
+# context and session, so this test can't use the connection-bound
+# db_savepoint session; it deletes the rows it logs instead
+@pytest.mark.usefixtures('app_ctx')
 def test_end_to_end_flow():
     """Test end-to-end WhatsApp message flow."""
     print("\\nTesting End-to-End Flow...")
     print("=" * 50)
     
     with app.app_context():
-        # Refresh sales data
+        # Sales data is seeded once per session by app_ctx; refresh only when run as a script
         sales_processor = SalesProcessor()
-        sales_processor.process_and_cache_sales_data("TEST_MERCHANT_001", days_back=7)
+        if not sales_processor.is_cache_fresh("TEST_MERCHANT_001"):
+            sales_processor.process_and_cache_sales_data("TEST_MERCHANT_001", days_back=7)
         
         # Simulate incoming webhook requests
         test_webhook_data = [
@@ -128,81 +162,95 @@ def test_end_to_end_flow():
         
         print("Simulating webhook requests:")
         
-        for webhook_data in test_webhook_data:
-            print(f"\\nIncoming message: '{webhook_data['Body']}'")
-            
-            # Process message using message processor
-            from src.services.message_processor import MessageProcessor
-            processor = MessageProcessor()
-            
-            response = processor.process_message(
-                webhook_data['Body'],
-                webhook_data['From']
-            )
+        # Feed the webhooks through a queue drained by concurrent consumers
+        answered = asyncio.run(_process_webhooks(message_processor, test_webhook_data))
+        responses = [answered[webhook_data['MessageSid']] for webhook_data in test_webhook_data]
+        
+        logged_sids = [f"{webhook_data['MessageSid']}_{uuid.uuid4().hex[:8]}" for webhook_data in test_webhook_data]
+        
+        try:
+            # Log every processed message in one multi-row insert on exit
+            with bulk_logging(db.session):
+                for webhook_data, response in zip(test_webhook_data, responses):
+                    print(f"\\nIncoming message: '{webhook_data['Body']}'")
+                    print(f"Generated response: {response}")
+                
+                WhatsAppMessage.bulk_log(db.session, [
+                    {
+                        'message_sid': message_sid,
+                        'from_number': webhook_data['From'],
+                        'to_number': webhook_data['To'],
+                        'message_body': webhook_data['Body'],
+                        'response_body': response,
+                        'processed': True
+                    }
+                    for message_sid, webhook_data, response in zip(logged_sids, test_webhook_data, responses)
+                ])
             
-            print(f"Generated response: {response}")
+            assert WhatsAppMessage.query.filter(WhatsAppMessage.message_sid.in_(logged_sids)).count() == len(logged_sids)
+        finally:
+            WhatsAppMessage.query.filter(WhatsAppMessage.message_sid.in_(logged_sids)).delete(synchronize_session=False)
+            db.session.commit()
 
-def test_api_endpoints():
-    """Test WhatsApp API endpoints."""
+# Assuming Flask is running on port 5001
+BASE_URL = "http://localhost:5001"
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=5)
+
+async def _post_json(session, path, payload):
+    """POST a JSON payload and return (status code, response text)."""
+    async with session.post(f"{BASE_URL}{path}", json=payload) as response:
+        return response.status, await response.text()
+
+async def _run_with_session(*checks):
+    """Run the given HTTP checks in order over one shared aiohttp session."""
+    async with aiohttp.ClientSession(timeout=HTTP_TIMEOUT) as session:
+        for check in checks:
+            await check(session)
+
+async def check_api_endpoints(session):
+    """Send the API endpoint requests concurrently and report each result."""
     print("\\nTesting API Endpoints...")
     print("=" * 50)
     
-    base_url = "http://localhost:5001"  # Assuming Flask is running on port 5001
-    
-    # Test sending a message via API
-    print("Testing /webhook/whatsapp/send endpoint:")
-    
-    send_data = {
-        'to': '+1234567890',
-        'message': 'This is a test message sent via API'
-    }
-    
-    try:
-        response = requests.post(
-            f"{base_url}/webhook/whatsapp/send",
-            json=send_data,
-            headers={'Content-Type': 'application/json'},
-            timeout=5
-        )
-        
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        
-    except requests.exceptions.RequestException as e:
-        print(f"❌ API request failed: {e}")
-        print("Note: Make sure Flask server is running on port 5001")
-    
-    # Test sending a sales report
-    print("\\nTesting /webhook/whatsapp/send-sales-report endpoint:")
+    api_requests = [
+        # Test sending a message via API
+        ("/webhook/whatsapp/send", {
+            'to': '+1234567890',
+            'message': 'This is a test message sent via API'
+        }),
+        # Test sending a sales report
+        ("/webhook/whatsapp/send-sales-report", {
+            'to': '+1234567890',
+            'merchant_id': 'TEST_MERCHANT_001',
+            'report_type': 'sales_summary'
+        })
+    ]
     
-    report_data = {
-        'to': '+1234567890',
-        'merchant_id': 'TEST_MERCHANT_001',
-        'report_type': 'sales_summary'
-    }
+    results = await asyncio.gather(
+        *(_post_json(session, path, payload) for path, payload in api_requests),
+        return_exceptions=True
+    )
     
-    try:
-        response = requests.post(
-            f"{base_url}/webhook/whatsapp/send-sales-report",
-            json=report_data,
-            headers={'Content-Type': 'application/json'},
-            timeout=5
-        )
+    for (path, _), result in zip(api_requests, results):
+        print(f"\\nTesting {path} endpoint:")
         
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
+        if isinstance(result, Exception):
+            print(f"❌ API request failed: {result!r}")
+            print("Note: Make sure Flask server is running on port 5001")
+            continue
         
-    except requests.exceptions.RequestException as e:
-        print(f"❌ API request failed: {e}")
-        print("Note: Make sure Flask server is running on port 5001")
+        status, body = result
+        print(f"Status Code: {status}")
+        try:
+            print(f"Response: {json.dumps(json.loads(body), indent=2)}")
+        except ValueError:
+            print(f"Response: {body}")
 
-def test_webhook_simulation():
-    """Test webhook simulation endpoint."""
+async def check_webhook_simulation(session):
+    """Send every simulated webhook concurrently and report each result."""
     print("\\nTesting Webhook Simulation...")
     print("=" * 50)
     
-    base_url = "http://localhost:5001"
-    
     webhook_tests = [
         {
             'MessageSid': 'TEST_WEBHOOK_001',
@@ -218,27 +266,33 @@ def test_webhook_simulation():
         }
     ]
     
-    for test_data in webhook_tests:
+    results = await asyncio.gather(
+        *(_post_json(session, "/api/test/webhook", test_data) for test_data in webhook_tests),
+        return_exceptions=True
+    )
+    
+    for test_data, result in zip(webhook_tests, results):
         print(f"\\nTesting webhook with message: '{test_data['Body']}'")
         
-        try:
-            response = requests.post(
-                f"{base_url}/api/test/webhook",
-                json=test_data,
-                headers={'Content-Type': 'application/json'},
-                timeout=5
-            )
-            
-            print(f"Status Code: {response.status_code}")
-            if response.status_code == 200:
-                result = response.json()
-                print(f"Response: {result.get('response', 'No response')}")
-            else:
-                print(f"Error: {response.text}")
-                
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Webhook test failed: {e}")
+        if isinstance(result, Exception):
+            print(f"❌ Webhook test failed: {result!r}")
             print("Note: Make sure Flask server is running on port 5001")
+            continue
+        
+        status, body = result
+        print(f"Status Code: {status}")
+        if status == 200:
+            print(f"Response: {json.loads(body).get('response', 'No response')}")
+        else:
+            print(f"Error: {body}")
+
+def test_api_endpoints():
+    """Test WhatsApp API endpoints."""
+    asyncio.run(_run_with_session(check_api_endpoints))
+
+def test_webhook_simulation():
+    """Test webhook simulation endpoint."""
+    asyncio.run(_run_with_session(check_webhook_simulation))
 
 def main():
     """Run all WhatsApp integration tests."""
@@ -249,8 +303,8 @@ def main():
         test_whatsapp_client()
         test_message_formatting()
         test_end_to_end_flow()
-        test_api_endpoints()
-        test_webhook_simulation()
+        # Both HTTP checks share one session (and its keep-alive connections)
+        asyncio.run(_run_with_session(check_api_endpoints, check_webhook_simulation))
         
         print("\\n" + "=" * 60)
         print("✅ All WhatsApp integration tests completed!")
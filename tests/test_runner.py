@@ -14,11 +14,19 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 
-def run_unit_tests():
-    """Run unit tests."""
+def run_unit_tests(workers='auto'):
+    """
+    Run unit tests in parallel with pytest-xdist.
+    
+    Files are the unit of distribution, and each worker process gets its own
+    in-memory database, so tests sharing one need no extra marking.
+    
+    Args:
+        workers: Number of xdist workers, 'auto' for one per CPU, or 0 to run in-process
+    """
     print("🧪 Running Unit Tests...")
     print("=" * 50)
-    cmd = [sys.executable, '-m', 'pytest', 'tests/unit/', '-v', '--tb=short']
+    cmd = [sys.executable, '-m', 'pytest', 'tests/unit/', '-n', str(workers), '--dist=loadfile', '-v', '--tb=short']
     return subprocess.run(cmd, cwd=project_root)
 
 
@@ -66,11 +74,14 @@ def main():
                        help='Type of tests to run')
     parser.add_argument('--verbose', '-v', action='store_true', 
                        help='Verbose output')
+    parser.add_argument('--workers', '-n', default='auto',
+                       help="pytest-xdist workers for unit tests, one file per worker at a time "
+                            "('auto' = one per CPU, 0 = run serially; default: auto)")
     
     args = parser.parse_args()
     
     if args.test_type == 'unit':
-        result = run_unit_tests()
+        result = run_unit_tests(args.workers)
     elif args.test_type == 'integration':
         result = run_integration_tests()
     elif args.test_type == 'all':
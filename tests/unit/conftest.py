@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Pytest fixtures shared by the unit tests.
+"""
+
+import pytest
+
+from src.services.whatsapp_client import WhatsAppClient
+
+
+@pytest.fixture(scope='session')
+def whatsapp_client():
+    """
+    One WhatsAppClient for the whole session.
+
+    The client only reads Config at construction, and the validator and
+    formatter tests don't change its state; tests that do should build their own.
+    """
+    return WhatsAppClient()
@@ -7,12 +7,19 @@ import unittest
 from unittest.mock import Mock, patch
 import os
 import sys
+import time
+from datetime import datetime, timedelta
 
 # Add the project root to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, project_root)
 
-from src.services.clover_api import CloverAPIClient
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.services.clover_api import (
+    CloverAPIClient, ORDER_FETCH_WORKERS, ORDER_PREFETCH_PAGES, _SESSION
+)
 
 
 class TestCloverAPIClient(unittest.TestCase):
@@ -22,7 +29,7 @@ class TestCloverAPIClient(unittest.TestCase):
         """Set up test fixtures."""
         self.client = CloverAPIClient()
 
-    @patch('src.services.clover_api.requests.get')
+    @patch('src.services.clover_api._SESSION.get')
     def test_get_orders_success(self, mock_get):
         """Test successful order retrieval."""
         mock_response = Mock()
@@ -40,7 +47,66 @@ class TestCloverAPIClient(unittest.TestCase):
         self.assertEqual(len(orders), 1)
         self.assertEqual(orders[0]['id'], 'ORDER_1')
 
-    @patch('src.services.clover_api.requests.get')
+    @patch('src.services.clover_api._SESSION.get')
+    def test_iter_orders_yields_one_page_at_a_time(self, mock_get):
+        """Test that orders are streamed page by page until a short page."""
+        pages = [
+            [{'id': 'ORDER_1'}, {'id': 'ORDER_2'}],
+            [{'id': 'ORDER_3'}, {'id': 'ORDER_4'}],
+            [{'id': 'ORDER_5'}]
+        ]
+        responses = []
+        for page in pages:
+            mock_response = Mock()
+            mock_response.json.return_value = {'elements': page}
+            mock_response.raise_for_status.return_value = None
+            responses.append(mock_response)
+        offsets = []
+        mock_get.side_effect = lambda url, params, headers: offsets.append(params['offset']) or responses[len(offsets) - 1]
+
+        client = CloverAPIClient(access_token='TOKEN', merchant_id='MERCHANT')
+        order_pages = client.iter_orders(page_size=2)
+
+        self.assertEqual(next(order_pages), pages[0])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(list(order_pages), pages[1:])
+        self.assertEqual(offsets, [0, 2, 4])
+
+    @patch('src.services.clover_api._SESSION.get')
+    def test_iter_orders_streams_sharded_windows(self, mock_get):
+        """Test that a sharded range yields pages in window order with bounded prefetch."""
+        pages_per_window = 10
+        end_date = datetime(2026, 1, 8)
+        start_date = end_date - timedelta(days=7)
+
+        def get_page(url, params, headers):
+            # One order per page, tagged with its window's start and its offset
+            window_start = params['filter'].split(' AND ')[0]
+            mock_response = Mock()
+            mock_response.raise_for_status.return_value = None
+            mock_response.json.return_value = {
+                'elements': [{'id': f"{window_start}@{params['offset']}"}] if params['offset'] < pages_per_window else []
+            }
+            return mock_response
+        mock_get.side_effect = get_page
+
+        client = CloverAPIClient(access_token='TOKEN', merchant_id='MERCHANT')
+        order_pages = client.iter_orders(start_date, end_date, page_size=1)
+
+        next(order_pages)
+        time.sleep(0.2)
+        # Each in-flight window holds its prefetched pages plus one waiting to be handed over
+        self.assertLessEqual(mock_get.call_count, ORDER_FETCH_WORKERS * (ORDER_PREFETCH_PAGES + 1) + 1)
+        self.assertLess(mock_get.call_count, 7 * pages_per_window)
+
+        expected_ids = [
+            f"{window.split(' AND ')[0]}@{offset}"
+            for window in client._order_windows(start_date, end_date)
+            for offset in range(pages_per_window)
+        ]
+        self.assertEqual([page[0]['id'] for page in order_pages], expected_ids[1:])
+
+    @patch('src.services.clover_api._SESSION.get')
     def test_get_inventory_items_success(self, mock_get):
         """Test successful inventory retrieval."""
         mock_response = Mock()
@@ -58,6 +124,28 @@ class TestCloverAPIClient(unittest.TestCase):
         self.assertEqual(len(items), 1)
         self.assertEqual(items[0]['name'], 'Cappuccino')
 
+    @patch.object(HTTPAdapter, 'send')
+    def test_requests_reuse_shared_keep_alive_session(self, mock_send):
+        """Test that clients share one pooled session and send keep-alive requests."""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"elements": []}'
+        mock_send.return_value = response
+
+        first = CloverAPIClient(access_token='TOKEN_1', merchant_id='MERCHANT_1')
+        second = CloverAPIClient(access_token='TOKEN_2', merchant_id='MERCHANT_2')
+        self.assertIs(first._session, _SESSION)
+        self.assertIs(second._session, _SESSION)
+
+        first.get_inventory_items()
+        second.get_inventory_items()
+
+        sent = [call.args[0] for call in mock_send.call_args_list]
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(sent[0].headers['Connection'], 'keep-alive')
+        self.assertEqual(sent[0].headers['Authorization'], 'Bearer TOKEN_1')
+        self.assertEqual(sent[1].headers['Authorization'], 'Bearer TOKEN_2')
+
     def test_validate_phone_number(self):
         """Test phone number validation."""
         valid_numbers = ['+1234567890', 'whatsapp:+1234567890']
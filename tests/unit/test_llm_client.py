@@ -12,7 +12,7 @@ import sys
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, project_root)
 
-from src.services.llm_client import LLMClient
+from src.services.llm_client import LLMClient, _response_cache
 
 
 class TestLLMClient(unittest.TestCase):
@@ -60,6 +60,29 @@ class TestLLMClient(unittest.TestCase):
         
         self.assertIsInstance(response, str)
 
+    def test_llm_cache_hit(self):
+        """Test that a repeated prompt is answered from the cache without another API call."""
+        _response_cache.clear()
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "Your best-selling drink is Cappuccino."
+        self.client.client = Mock()
+        self.client.client.chat.completions.create.return_value = mock_response
+        self.client.model = 'test-model'
+        self.client.use_llm = True
+        sales_data = {'best_selling_items': [{'item_name': 'Cappuccino', 'quantity_sold': 150, 'total_revenue': 750.0}]}
+
+        first = self.client.generate_response("What's my best-selling drink?", "", sales_data)
+        second = self.client.generate_response("What's my best-selling drink?", "", sales_data)
+
+        self.assertEqual(first, "Your best-selling drink is Cappuccino.")
+        self.assertEqual(second, first)
+        self.assertEqual(self.client.client.chat.completions.create.call_count, 1)
+
+        self.client.generate_response("How many lattes did I sell?", "", sales_data)
+        self.assertEqual(self.client.client.chat.completions.create.call_count, 2)
+        _response_cache.clear()
+
 
 if __name__ == '__main__':
     unittest.main()
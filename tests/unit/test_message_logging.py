@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Unit tests for bulk WhatsApp message logging.
+"""
+
+import unittest
+import os
+import sys
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, project_root)
+
+from src.models.sales_cache import WhatsAppMessage, bulk_logging
+
+
+class TestBulkMessageLogging(unittest.TestCase):
+    """Test cases for WhatsAppMessage.bulk_log and bulk_logging."""
+
+    def setUp(self):
+        """Set up an in-memory database with the messages table."""
+        self.engine = create_engine('sqlite://')
+        WhatsAppMessage.__table__.create(self.engine)
+        self.session = Session(self.engine)
+
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record_statement)
+
+    def tearDown(self):
+        """Close the session and dispose of the engine."""
+        self.session.close()
+        self.engine.dispose()
+
+    def _record_statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def test_bulk_log_issues_single_insert(self):
+        """Test that 50 queued messages are written with one INSERT statement."""
+        records = [
+            {
+                'message_sid': f'BULK_TEST_{i}',
+                'from_number': 'whatsapp:+1234567890',
+                'to_number': 'whatsapp:+14155238886',
+                'message_body': f'Test message {i}'
+            }
+            for i in range(50)
+        ]
+
+        with bulk_logging(self.session):
+            WhatsAppMessage.bulk_log(self.session, records)
+
+        inserts = [statement for statement in self.statements if statement.lstrip().upper().startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(self.session.query(WhatsAppMessage).count(), 50)
+
+    def test_bulk_logging_discards_queue_on_error(self):
+        """Test that queued messages are dropped, not written, when the body raises."""
+        with self.assertRaises(RuntimeError):
+            with bulk_logging(self.session):
+                WhatsAppMessage.bulk_log(self.session, [{
+                    'message_sid': 'BULK_FAIL_1',
+                    'from_number': 'whatsapp:+1234567890',
+                    'to_number': 'whatsapp:+14155238886',
+                    'message_body': 'Never logged'
+                }])
+                raise RuntimeError('processing failed')
+
+        with bulk_logging(self.session):
+            pass
+
+        self.assertEqual(self.session.query(WhatsAppMessage).count(), 0)
+
+    def test_bulk_log_queue_is_per_session(self):
+        """Test that closing one session's bulk_logging block doesn't write another session's rows."""
+        other = Session(self.engine)
+        try:
+            WhatsAppMessage.bulk_log(other, [{
+                'message_sid': 'OTHER_SESSION_1',
+                'from_number': 'whatsapp:+1234567890',
+                'to_number': 'whatsapp:+14155238886',
+                'message_body': 'Queued elsewhere'
+            }])
+
+            with bulk_logging(self.session):
+                pass
+
+            self.assertEqual(self.session.query(WhatsAppMessage).count(), 0)
+        finally:
+            other.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
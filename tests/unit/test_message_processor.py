@@ -7,6 +7,7 @@ import unittest
 from unittest.mock import Mock, patch
 import os
 import sys
+import time
 
 # Add the project root to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -61,6 +62,73 @@ class TestMessageProcessor(unittest.TestCase):
         self.assertIsInstance(response, str)
         self.assertGreater(len(response), 0)
 
+    def test_process_messages_batch_keeps_order_and_batches_llm_calls(self):
+        """Test that batched processing answers in input order with one LLM call per intent."""
+        self.processor.sales_processor = Mock()
+        self.processor.sales_processor.is_cache_fresh.return_value = True
+        self.processor.sales_processor.get_best_selling_items_for_merchants.side_effect = (
+            lambda merchant_ids, limit=10: {
+                merchant_id: [{'item_name': 'Cappuccino', 'quantity_sold': 150, 'total_revenue': 750.0}]
+                for merchant_id in merchant_ids
+            }
+        )
+        self.processor.llm_client = Mock()
+        self.processor.llm_client.generate_responses.side_effect = (
+            lambda questions, context, sales_data=None: [f"answer to {q}" for q in questions]
+        )
+
+        responses = self.processor.process_messages_batch([
+            ("What's my best-selling drink?", "whatsapp:+1234567890"),
+            ("Hello", "whatsapp:+1234567890"),
+            ("How many lattes sold?", "whatsapp:+1234567890"),
+            ("Tell me a joke", "whatsapp:+1234567890")
+        ])
+
+        self.assertEqual(len(responses), 4)
+        self.assertEqual(responses[0], "answer to what's my best-selling drink?")
+        self.assertIn("Hello", responses[1])
+        self.assertEqual(responses[2], "answer to how many lattes sold?")
+        self.assertEqual(responses[3], "answer to tell me a joke")
+        # One call for the two sales questions, one for the general question
+        self.assertEqual(self.processor.llm_client.generate_responses.call_count, 2)
+        self.processor.sales_processor.get_best_selling_items_for_merchants.assert_called_once()
+        self.processor.sales_processor.get_best_selling_items.assert_not_called()
+
+    def test_is_cache_fresh_called_once(self):
+        """Test that a burst of sales questions checks cache freshness only once."""
+        self.processor.sales_processor = Mock()
+        self.processor.sales_processor.is_cache_fresh.return_value = True
+        self.processor.sales_processor.get_best_selling_items.return_value = [
+            {'item_name': 'Cappuccino', 'quantity_sold': 150, 'total_revenue': 750.0}
+        ]
+        self.processor.llm_client = Mock()
+        self.processor.llm_client.generate_response.return_value = "Your best-selling item is Cappuccino."
+
+        for _ in range(3):
+            self.processor.process_message("What's my best-selling drink?", "whatsapp:+1234567890")
+
+        self.assertEqual(self.processor.sales_processor.is_cache_fresh.call_count, 1)
+        self.assertEqual(self.processor.sales_processor.get_best_selling_items.call_count, 3)
+
+    def test_intent_classification_throughput(self):
+        """Test that intent checks classify correctly and stay cheap per message."""
+        messages = [
+            "what's my best-selling drink?", "hello", "help", "tell me a joke",
+            "how many lattes sold today?", "show me a weekly report"
+        ]
+        expected = [True, False, False, False, True, False]
+        self.assertEqual([self.processor._is_sales_question(m) for m in messages], expected)
+
+        iterations = 20000
+        start = time.perf_counter()
+        for i in range(iterations):
+            message = messages[i % len(messages)]
+            self.processor._is_greeting(message) or self.processor._is_help_request(message) \
+                or self.processor._is_sales_question(message)
+        elapsed = time.perf_counter() - start
+
+        self.assertGreater(iterations / elapsed, 10000)
+
 
 if __name__ == '__main__':
     unittest.main()
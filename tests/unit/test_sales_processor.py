@@ -7,12 +7,22 @@ import unittest
 from unittest.mock import Mock, patch
 import os
 import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert, inspect, select
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.dialects import postgresql, sqlite
 
 # Add the project root to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, project_root)
 
-from src.services.sales_processor import SalesProcessor
+from src.main import app, db
+from src.models.sales_cache import SalesCache, TopSellersSummary, ensure_sales_cache_indexes
+from src.services.sales_processor import (
+    SalesProcessor, COPY_THRESHOLD, IN_LIST_THRESHOLD, _best_sellers_cache, _in_values, _write_sales_rows,
+    invalidate_best_sellers
+)
 
 
 class TestSalesProcessor(unittest.TestCase):
@@ -32,7 +42,17 @@ class TestSalesProcessor(unittest.TestCase):
                 'total': 500,
                 'lineItems': {
                     'elements': [
-                        {'item': {'id': 'ITEM_1', 'name': 'Cappuccino'}, 'unitQty': 2}
+                        {'item': {'id': 'ITEM_1', 'name': 'Cappuccino'}, 'unitQty': 2, 'price': 450},
+                        {'item': {'id': 'ITEM_2', 'name': 'Croissant'}, 'unitQty': 1, 'price': 300}
+                    ]
+                }
+            },
+            {
+                'id': 'ORDER_2',
+                'total': 900,
+                'lineItems': {
+                    'elements': [
+                        {'item': {'id': 'ITEM_1', 'name': 'Cappuccino'}, 'unitQty': 2, 'price': 450}
                     ]
                 }
             }
@@ -45,6 +65,97 @@ class TestSalesProcessor(unittest.TestCase):
         self.assertIn('success', result)
         self.assertIn('orders_processed', result)
 
+    def test_aggregate_orders_sums_each_item_across_orders(self):
+        """Test that line items for the same item are summed across orders and unknown items skipped."""
+        orders = [
+            {'lineItems': {'elements': [
+                {'item': {'id': 'ITEM_1', 'name': 'Cappuccino'}, 'unitQty': 2, 'price': 450},
+                {'item': {'id': 'ITEM_2', 'name': 'Croissant'}, 'unitQty': 1, 'price': 300},
+                {'item': {}, 'unitQty': 5, 'price': 100}
+            ]}},
+            {'lineItems': {'elements': [
+                {'item': {'id': 'ITEM_1', 'name': 'Cappuccino'}, 'unitQty': 3, 'price': 450}
+            ]}},
+            {'lineItems': None}
+        ]
+
+        quantities, revenue_cents, names, orders_processed = self.processor._aggregate_orders(iter(orders))
+
+        self.assertEqual(dict(quantities), {'ITEM_1': 5, 'ITEM_2': 1})
+        self.assertEqual(dict(revenue_cents), {'ITEM_1': 2250, 'ITEM_2': 300})
+        self.assertEqual(names, {'ITEM_1': 'Cappuccino', 'ITEM_2': 'Croissant'})
+        self.assertEqual(orders_processed, 3)
+
+    @patch('src.services.sales_processor.refresh_top_sellers')
+    @patch('src.services.sales_processor._copy_upsert_sales_rows')
+    @patch('src.services.sales_processor.db')
+    def test_write_sales_rows_uses_copy_above_threshold(self, mock_db, mock_copy, mock_refresh):
+        """Test that large PostgreSQL cache writes go through COPY and small ones don't."""
+        mock_db.session.get_bind.return_value.dialect.name = 'postgresql'
+        row = {
+            'merchant_id': 'TEST_MERCHANT', 'item_id': 'ITEM_1', 'item_name': 'Cappuccino',
+            'category': 'Coffee', 'quantity_sold': 2, 'total_revenue': 10.0,
+            'period_start': None, 'period_end': None, 'last_updated': None
+        }
+
+        large_batch = [dict(row, item_id=f'ITEM_{i}') for i in range(COPY_THRESHOLD + 1)]
+        _write_sales_rows(['TEST_MERCHANT'], large_batch)
+        mock_copy.assert_called_once_with(large_batch)
+
+        mock_copy.reset_mock()
+        _write_sales_rows(['TEST_MERCHANT'], [row])
+        mock_copy.assert_not_called()
+        mock_db.session.execute.assert_called()
+
+    def test_upsert_on_table_created_before_unique_index(self):
+        """Test that startup DDL dedupes a pre-existing sales_cache so the upsert can run on it."""
+        period_end = datetime.utcnow()
+        row = {
+            'merchant_id': 'LEGACY_MERCHANT', 'item_id': 'ITEM_1', 'item_name': 'Cappuccino',
+            'category': 'Coffee', 'quantity_sold': 2, 'total_revenue': 10.0,
+            'period_start': period_end - timedelta(days=7), 'period_end': period_end,
+            'last_updated': period_end
+        }
+
+        with app.app_context():
+            # Recreate the table the way older releases did: no late indexes,
+            # and duplicate rows left behind by the old delete-then-insert path
+            SalesCache.__table__.drop(db.engine)
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(CreateTable(SalesCache.__table__))
+                    connection.execute(insert(SalesCache), [row, dict(row, quantity_sold=3)])
+
+                ensure_sales_cache_indexes(db.engine)
+                index_names = {index['name'] for index in inspect(db.engine).get_indexes('sales_cache')}
+                self.assertIn('uq_sales_cache_merchant_item', index_names)
+                self.assertIn('idx_merchant_last_updated', index_names)
+                self.assertIn('idx_merchant_period_quantity', index_names)
+
+                _write_sales_rows(['LEGACY_MERCHANT'], [dict(row, quantity_sold=5)])
+                db.session.commit()
+
+                cached = SalesCache.query.filter_by(merchant_id='LEGACY_MERCHANT').all()
+                self.assertEqual([item.quantity_sold for item in cached], [5])
+            finally:
+                db.session.rollback()
+                SalesCache.__table__.drop(db.engine)
+                SalesCache.__table__.create(db.engine)
+                TopSellersSummary.query.filter_by(merchant_id='LEGACY_MERCHANT').delete()
+                db.session.commit()
+
+    def test_in_values_binds_large_lists_as_one_parameter(self):
+        """Test that large merchant IN filters compile to a single bound parameter."""
+        merchant_ids = [f'MERCHANT_{i}' for i in range(IN_LIST_THRESHOLD * 100)]
+
+        for name, dialect in (('postgresql', postgresql.dialect()), ('sqlite', sqlite.dialect())):
+            stmt = select(SalesCache.id).where(_in_values(SalesCache.merchant_id, merchant_ids, name))
+            compiled = stmt.compile(dialect=dialect)
+            self.assertEqual(len(compiled.params), 1, name)
+
+        short = select(SalesCache.id).where(_in_values(SalesCache.merchant_id, ['MERCHANT_1'], 'sqlite'))
+        self.assertIn('IN', str(short.compile(dialect=sqlite.dialect())))
+
     def test_get_best_selling_items_empty(self):
         """Test getting best selling items with empty data."""
         items = self.processor.get_best_selling_items('INVALID_MERCHANT')
@@ -52,6 +163,102 @@ class TestSalesProcessor(unittest.TestCase):
         self.assertIsInstance(items, list)
         self.assertEqual(len(items), 0)
 
+    def test_get_best_selling_items_limits_sql(self):
+        """Test that a best-seller lookup is one SELECT whose ordering and LIMIT run in SQL."""
+        _best_sellers_cache.clear()
+        statements = []
+
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            db.create_all()
+            event.listen(db.engine, 'before_cursor_execute', record_statement)
+            try:
+                self.processor.get_best_selling_items('TEST_MERCHANT', limit=3, category='Coffee')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record_statement)
+
+        selects = [statement for statement in statements if statement.lstrip().upper().startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+        self.assertIn('ORDER BY', selects[0].upper())
+        self.assertIn('LIMIT', selects[0].upper())
+
+    def test_best_selling_items_for_merchants_single_query(self):
+        """Test that several merchants' best sellers are fetched with one SELECT."""
+        _best_sellers_cache.clear()
+        merchant_ids = ['BATCH_MERCHANT_1', 'BATCH_MERCHANT_2', 'BATCH_MERCHANT_3']
+        period_end = datetime.utcnow()
+        statements = []
+
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            db.create_all()
+            db.session.add_all([
+                TopSellersSummary(
+                    merchant_id=merchant_id, rank=rank, sales_cache_id=rank, item_id=f'ITEM_{rank}',
+                    item_name=f'Item {rank}', category='Coffee', quantity_sold=100 - rank,
+                    total_revenue=5.0 * (100 - rank), period_start=period_end - timedelta(days=7),
+                    period_end=period_end
+                )
+                for merchant_id in merchant_ids
+                for rank in range(1, 4)
+            ])
+            db.session.commit()
+
+            event.listen(db.engine, 'before_cursor_execute', record_statement)
+            try:
+                results = self.processor.get_best_selling_items_for_merchants(merchant_ids, limit=2)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record_statement)
+                TopSellersSummary.query.filter(TopSellersSummary.merchant_id.in_(merchant_ids)).delete()
+                db.session.commit()
+
+        self.assertEqual(sorted(results), merchant_ids)
+        for items in results.values():
+            self.assertEqual([item['item_id'] for item in items], ['ITEM_1', 'ITEM_2'])
+        selects = [statement for statement in statements if statement.lstrip().upper().startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+        _best_sellers_cache.clear()
+
+    def test_best_selling_items_cache_hit(self):
+        """Test that repeated best-seller lookups are served from memory until invalidated."""
+        _best_sellers_cache.clear()
+        items = [{'item_name': 'Cappuccino', 'quantity_sold': 150}]
+
+        with patch.object(SalesProcessor, '_query_best_selling_items', return_value=items) as mock_query:
+            first = self.processor.get_best_selling_items('TEST_MERCHANT', limit=5)
+            second = SalesProcessor().get_best_selling_items('TEST_MERCHANT', limit=5)
+            self.assertEqual(first, items)
+            self.assertEqual(second, items)
+            self.assertEqual(mock_query.call_count, 1)
+
+            invalidate_best_sellers(['TEST_MERCHANT'])
+            self.processor.get_best_selling_items('TEST_MERCHANT', limit=5)
+            self.assertEqual(mock_query.call_count, 2)
+
+        _best_sellers_cache.clear()
+
+    def test_cache_clear_refetches_inventory(self):
+        """Test that clearing a merchant's cache makes the next refresh refetch inventory."""
+        from src.routes import api
+
+        clover_client = Mock()
+        clover_client.get_inventory_items.return_value = [{'id': 'ITEM_1', 'name': 'Cappuccino'}]
+
+        with patch.object(api.sales_processor, 'clover_client', clover_client), \
+                patch.object(api.sales_processor, '_item_meta', None):
+            api.sales_processor._get_item_meta()
+            clover_client.get_inventory_items.return_value = [{'id': 'ITEM_1', 'name': 'Flat White'}]
+
+            response = app.test_client().post('/api/sales/cache-clear', json={'merchant_id': 'TEST_MERCHANT'})
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(api.sales_processor._get_item_meta()['ITEM_1'][0], 'Flat White')
+            self.assertEqual(clover_client.get_inventory_items.call_count, 2)
+
     def test_is_cache_fresh_no_data(self):
         """Test cache freshness check with no data."""
         is_fresh = self.processor.is_cache_fresh('INVALID_MERCHANT')
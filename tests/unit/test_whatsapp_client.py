@@ -3,81 +3,164 @@
 Unit tests for WhatsApp client.
 """
 
-import unittest
-from unittest.mock import Mock, patch
-import os
-import sys
-
-# Add the project root to the Python path
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-sys.path.insert(0, project_root)
-
-from src.services.whatsapp_client import WhatsAppClient
-
-
-class TestWhatsAppClient(unittest.TestCase):
-    """Test cases for WhatsAppClient."""
-
-    def setUp(self):
-        """Set up test fixtures."""
-        self.client = WhatsAppClient()
-
-    def test_validate_phone_number_valid(self):
-        """Test phone number validation with valid numbers."""
-        valid_numbers = [
-            '+1234567890',
-            'whatsapp:+1234567890',
-            '+44123456789',
-            'whatsapp:+44123456789'
-        ]
-        
-        for number in valid_numbers:
-            with self.subTest(number=number):
-                self.assertTrue(self.client.validate_phone_number(number))
-
-    def test_validate_phone_number_invalid(self):
-        """Test phone number validation with invalid numbers."""
-        invalid_numbers = [
-            '1234567890',  # Missing +
-            '+123',        # Too short
-            '+123456789012345678',  # Too long
-            'invalid',     # Not a number
-            '',            # Empty
-            None           # None
-        ]
-        
-        for number in invalid_numbers:
-            with self.subTest(number=number):
-                self.assertFalse(self.client.validate_phone_number(number))
-
-    @patch('src.services.whatsapp_client.client')
-    def test_send_message_success(self, mock_twilio_client):
-        """Test successful message sending."""
-        mock_message = Mock()
-        mock_message.sid = 'TEST_SID_123'
-        mock_twilio_client.messages.create.return_value = mock_message
-
-        result = self.client.send_message('+1234567890', 'Test message')
-        
-        self.assertTrue(result['success'])
-        self.assertEqual(result['message_sid'], 'TEST_SID_123')
-
-    def test_format_business_message_sales_summary(self):
-        """Test formatting sales summary message."""
-        mock_data = {
-            'best_selling_items': [
-                {'item_name': 'Cappuccino', 'quantity_sold': 150, 'total_revenue': 750.0, 'category': 'Coffee'},
-                {'item_name': 'Latte', 'quantity_sold': 120, 'total_revenue': 660.0, 'category': 'Coffee'}
-            ]
-        }
-        
-        formatted_msg = self.client.format_business_message(mock_data, 'sales_summary')
-        
-        self.assertIsInstance(formatted_msg, str)
-        self.assertIn('Cappuccino', formatted_msg)
-        self.assertIn('150', formatted_msg)
-        self.assertIn('750.00', formatted_msg)
-
-
-if __name__ == '__main__':
-    unittest.main()
+import asyncio
+import httpx
+import pytest
+import re
+from types import SimpleNamespace
+from unittest.mock import Mock
+import time
+
+from src.services.whatsapp_client import _validate_phone_number
+
+# Top item's name, units and revenue, in the order the summary prints them
+_SALES_RE = re.compile(r'(?s)Cappuccino.*150.*750\.00')
+
+# Formatter input shared by the formatting tests; rows are read-only
+SALES_SUMMARY_FIXTURE = {
+    'best_selling_items': (
+        {'item_name': 'Cappuccino', 'quantity_sold': 150, 'total_revenue': 750.0, 'category': 'Coffee'},
+        {'item_name': 'Latte', 'quantity_sold': 120, 'total_revenue': 660.0, 'category': 'Coffee'}
+    )
+}
+
+
+@pytest.fixture(autouse=True)
+def _mock_twilio(monkeypatch, whatsapp_client):
+    """Point the shared client at a stub Twilio client; monkeypatch restores it after each test."""
+    twilio = Mock()
+    twilio.messages.create.return_value = SimpleNamespace(sid='TEST_SID_123', status='queued')
+    monkeypatch.setattr(whatsapp_client, 'client', twilio)
+    monkeypatch.setattr(whatsapp_client, 'use_mock', False)
+    return twilio
+
+
+@pytest.mark.parametrize('number', [
+    '+1234567890',
+    'whatsapp:+1234567890',
+    '+44123456789',
+    'whatsapp:+44123456789'
+])
+def test_validate_phone_number_valid(whatsapp_client, number):
+    """Test phone number validation with valid numbers."""
+    assert whatsapp_client.validate_phone_number(number)
+
+
+@pytest.mark.parametrize('number', [
+    '1234567890',  # Missing +
+    '+123',        # Too short
+    '+123456789012345678',  # Too long
+    'invalid',     # Not a number
+    '',            # Empty
+    None           # None
+])
+def test_validate_phone_number_invalid(whatsapp_client, number):
+    """Test phone number validation with invalid numbers."""
+    assert not whatsapp_client.validate_phone_number(number)
+
+
+def test_send_message_success(whatsapp_client, _mock_twilio):
+    """Test successful message sending."""
+    result = whatsapp_client.send_message('+1234567890', 'Test message')
+
+    assert result['success']
+    assert result['message_sid'] == 'TEST_SID_123'
+    _mock_twilio.messages.create.assert_called_once()
+
+
+def test_format_business_message_sales_summary(whatsapp_client):
+    """Test formatting sales summary message."""
+    formatted_msg = whatsapp_client.format_business_message(SALES_SUMMARY_FIXTURE, 'sales_summary')
+
+    assert isinstance(formatted_msg, str) and _SALES_RE.search(formatted_msg), formatted_msg
+
+
+def test_format_business_message_perf(whatsapp_client):
+    """Test formatting over a 10k-item inventory: correct totals, top items only, fast."""
+    items = [
+        {'item_name': f'Item {i}', 'quantity_sold': 1, 'total_revenue': 2.5, 'category': 'Coffee'}
+        for i in range(10000)
+    ]
+    data = {'best_selling_items': items}
+
+    start = time.perf_counter()
+    summary = whatsapp_client.format_business_message(data, 'sales_summary')
+    report = whatsapp_client.format_business_message(data, 'revenue_report')
+    elapsed = time.perf_counter() - start
+
+    assert '10000 items | $25000.00' in summary
+    assert 'Item 5' not in summary
+    assert 'Total Revenue: $25000.00' in report
+    assert elapsed < 0.1
+
+
+def test_validate_phone_number_cache_hit(whatsapp_client):
+    """Test that repeated validation of a number is answered from the cache."""
+    _validate_phone_number.cache_clear()
+
+    for _ in range(5):
+        assert whatsapp_client.validate_phone_number('whatsapp:+1234567890')
+    assert not whatsapp_client.validate_phone_number('+123')
+
+    info = _validate_phone_number.cache_info()
+    assert info.misses == 2
+    assert info.hits == 4
+
+
+def _send_async(whatsapp_client, monkeypatch, handler):
+    """Send one message through send_message_async over a MockTransport answering with handler."""
+    monkeypatch.setattr(whatsapp_client, 'account_sid', 'AC_TEST')
+    monkeypatch.setattr(whatsapp_client, 'auth_token', 'TOKEN')
+    monkeypatch.setattr(whatsapp_client, 'whatsapp_number', 'whatsapp:+14155238886')
+    requests_seen = []
+
+    def respond(request):
+        requests_seen.append(request)
+        return handler(request)
+
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(respond)) as http_client:
+            return await whatsapp_client.send_message_async('+1234567890', 'Test message', http_client=http_client)
+
+    return asyncio.run(send()), requests_seen
+
+
+def test_send_message_async_success(whatsapp_client, monkeypatch):
+    """Test that a 201 from Twilio maps to a successful send result."""
+    result, requests_seen = _send_async(
+        whatsapp_client, monkeypatch,
+        lambda request: httpx.Response(201, json={'sid': 'SM_ASYNC_1', 'status': 'queued'})
+    )
+
+    assert result['success']
+    assert result['message_sid'] == 'SM_ASYNC_1'
+    assert result['status'] == 'queued'
+    assert result['to'] == 'whatsapp:+1234567890'
+
+    request, = requests_seen
+    assert request.url.path == '/2010-04-01/Accounts/AC_TEST/Messages.json'
+    assert b'To=whatsapp%3A%2B1234567890' in request.content
+
+
+def test_send_message_async_twilio_error(whatsapp_client, monkeypatch):
+    """Test that a 4xx Twilio error is reported with its message and code."""
+    result, _ = _send_async(
+        whatsapp_client, monkeypatch,
+        lambda request: httpx.Response(400, json={'code': 21211, 'message': "Invalid 'To' Phone Number"})
+    )
+
+    assert not result['success']
+    assert result['error'] == "Invalid 'To' Phone Number"
+    assert result['error_code'] == 21211
+
+
+def test_send_message_async_non_json_error(whatsapp_client, monkeypatch):
+    """Test that a 4xx with a non-JSON body is still reported as a Twilio error."""
+    result, _ = _send_async(
+        whatsapp_client, monkeypatch,
+        lambda request: httpx.Response(403, text='<html>Forbidden</html>')
+    )
+
+    assert not result['success']
+    assert result['error'] == '<html>Forbidden</html>'
+    assert result['error_code'] is None